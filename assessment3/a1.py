@@ -1,4 +1,77 @@
+import argparse
+import json
+import sys
+from functools import lru_cache
+
 from a1_support import *
+from a1_board import (ChunkedBoard, GameBoard, adjacency_counts, neighbour_table,
+                      neighbours_of)
+
+# boards that are written in place and keep their own counts
+BOARD_TYPES = (GameBoard, ChunkedBoard)
+
+
+@lru_cache(maxsize=4)
+def board_frame(grid_size):
+    """The parts of the displayed board that do not depend on the game.
+
+    Boards up to 26 rows and 99 columns are drawn exactly as they always were,
+    larger boards widen the row labels and cells to fit.
+
+    Parameters:
+        grid_size (int): The grid size of the game.
+
+    Returns:
+        (tuple<str, str, tuple<str, ...>, str, str>): The column headings, the
+        row separator, the start of every row, the text between two cells and
+        the end of every row.
+    """
+    labels = row_labels(grid_size)[0]
+    label_width = max(map(len, labels), default=1)
+    cell_width = max(2, len(str(grid_size)))
+    padding = " " * (cell_width - 1)
+
+    # python magic: string format alignment
+    header = " " * label_width + f" {WALL_VERTICAL}" + "".join(
+        f" {i:<{cell_width}}{WALL_VERTICAL}" for i in range(1, grid_size + 1))
+    separator = WALL_HORIZONTAL * (label_width + 3 + (cell_width + 2) * grid_size)
+    row_starts = tuple(f"{label:<{label_width}} {WALL_VERTICAL} " for label in labels)
+    return header, separator, row_starts, f"{padding}{WALL_VERTICAL} ", padding + WALL_VERTICAL
+
+
+def render_row(game, grid_size, row):
+    """Draw one row of the board.
+
+    Parameters:
+        game (str): The string representation of the game
+        grid_size (int): The grid size of the game.
+        row (int): The row to draw.
+
+    Returns:
+        (str): The row as it appears in the displayed board.
+    """
+    _, _, row_starts, between, row_end = board_frame(grid_size)
+    start = row * grid_size
+    return row_starts[row] + between.join(game[start:start + grid_size]) + row_end
+
+
+def render_game(game, grid_size):
+    """Draw the board as printed by display_game.
+
+    Parameters:
+        game (str): The string representation of the game
+        grid_size (int): The grid size of the game.
+
+    Returns:
+        (str): The board, without a trailing newline.
+    """
+    game = str(game)
+    header, separator = board_frame(grid_size)[:2]
+    lines = [header, separator]
+    for row in range(grid_size):
+        lines.append(render_row(game, grid_size, row))
+        lines.append(separator)
+    return "\n".join(lines)
 
 
 def display_game(game, grid_size):
@@ -8,27 +81,48 @@ def display_game(game, grid_size):
         game (str): The string representation of the game
         grid_size (int): The grid size of the game.
     """
-    row_separator = '\n' + WALL_HORIZONTAL * (grid_size + 1) * 4
+    print(render_game(game, grid_size))
 
-    # column headings
-    first_row = f"  {WALL_VERTICAL}"
-    for i in range(1, grid_size + 1):
-        # python magic: string format alignment
-        first_row += f" {i:<2}{WALL_VERTICAL}"
 
-    game_board = first_row + row_separator
+class TerminalRenderer:
+    """Draws a board on an ANSI terminal, redrawing only the rows that changed.
 
-    # Game Grid
-    for i in range(grid_size):
-        row = f"{ALPHA[i]} "
-        for j in range(grid_size):
-            char = game[position_to_index((i, j), grid_size)]
-            row += f"{WALL_VERTICAL} {char} "
+    The first draw prints the whole board like display_game. Later draws move
+    the cursor back up over the board and rewrite just the changed rows, so
+    nothing else may be printed between draws.
+    """
 
-        game_board += "\n" + row + WALL_VERTICAL
-        game_board += row_separator
+    def __init__(self, grid_size):
+        """
+        Parameters:
+            grid_size (int): The grid size of the game.
+        """
+        self._grid_size = grid_size
+        self._rows = None
 
-    print(game_board)
+    def draw(self, game):
+        """Draw the game, in full the first time and by changed rows after.
+
+        Parameters:
+            game (str): The string representation of the game
+        """
+        game = str(game)
+        rows = [render_row(game, self._grid_size, row) for row in range(self._grid_size)]
+        if self._rows is None:
+            display_game(game, self._grid_size)
+        else:
+            # the cursor sits on the line below the last row separator
+            output = []
+            for row, (old, new) in enumerate(zip(self._rows, rows)):
+                if old != new:
+                    up = 2 * (self._grid_size - row)
+                    output.append(f"\x1b[{up}A\r{new}\x1b[K\x1b[{up}B\r")
+            print("".join(output), end="", flush=True)
+        self._rows = rows
+
+    def invalidate(self):
+        """Make the next draw print the whole board again."""
+        self._rows = None
 
 
 def parse_position(action, grid_size):
@@ -37,6 +131,8 @@ def parse_position(action, grid_size):
     This function should return None if the action is not the correct format.
     i.e it's not a capital letter followed by a number (e.g. A1).
 
+    Rows past Z are labelled like spreadsheet columns: AA, AB, ..., AZ, BA.
+
     Parameters:
         action (str): The string containing the row (Cap) and column.
         grid_size (int): Size of game.
@@ -50,15 +146,16 @@ def parse_position(action, grid_size):
     if len(action) < 2:
         return None
 
-    row, column = action[0], action[1:]
+    split = len(action) - len(action.lstrip(ALPHA))
+    row, column = action[:split], action[split:]
 
-    if not column.isdigit():
+    if not row or not column.isdigit():
         return None
 
-    x = ALPHA.find(row)
+    x = row_labels(grid_size)[1].get(row)
     y = int(column) - 1
-    
-    if x == -1 or not 0 <= y < grid_size:
+
+    if x is None or not 0 <= y < grid_size:
         return None
 
     return x, y
@@ -81,6 +178,9 @@ def position_to_index(position, grid_size):
 def replace_character_at_index(game, index, character):
     """A specified index in the game string at the specified index is replaced by
     a new character.
+
+    A GameBoard is written in place and returned rather than copied.
+
     Parameters:
         game (str): The game string.
         index (int): The index in the game string where the character is replaced.
@@ -89,6 +189,9 @@ def replace_character_at_index(game, index, character):
     Returns:
         (str): The updated game string.
     """
+    if isinstance(game, BOARD_TYPES):
+        game[index] = character
+        return game
     return game[:index] + character + game[index + 1:]
 
 
@@ -164,18 +267,15 @@ def neighbour_directions(index, grid_size):
     Returns:
         (list<int>): A list of index that has a neighbouring cell.
     """
-    neighbours = []
-    for direction in DIRECTIONS:
-        neighbour = index_in_direction(index, grid_size, direction)
-        if neighbour is not None:
-            neighbours.append(neighbour)
-
-    return neighbours
+    return neighbours_of(index, grid_size).tolist()
 
 
 def number_at_cell(game, pokemon_locations, grid_size, index):
     """Calculates what number should be displayed at that specific index in the game.
 
+    A GameBoard holding these pokemon locations answers from its precomputed
+    adjacency counts.
+
     Parameters:
         game (str): Game string.
         pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
@@ -188,8 +288,12 @@ def number_at_cell(game, pokemon_locations, grid_size, index):
     if game[index] != UNEXPOSED:
         return int(game[index])
 
+    if (isinstance(game, BOARD_TYPES)
+            and game.get_pokemon_locations() is pokemon_locations):
+        return game.get_adjacency()[index]
+
     number = 0
-    for neighbour in neighbour_directions(index, grid_size):
+    for neighbour in neighbours_of(index, grid_size):
         if neighbour in pokemon_locations:
             number += 1
 
@@ -201,6 +305,8 @@ def number_at_cell(game, pokemon_locations, grid_size, index):
 def check_win(game, pokemon_locations):
     """Checking if the player has won the game.
 
+    A GameBoard answers from its running counts instead of scanning the cells.
+
     Parameters:
         game (str): Game string.
         pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
@@ -209,6 +315,9 @@ def check_win(game, pokemon_locations):
         (bool): True if the player has won the game, false if not.
 
     """
+    if isinstance(game, BOARD_TYPES):
+        return (game.get_num_unexposed() == 0
+                and game.get_num_flags() == len(pokemon_locations))
     return UNEXPOSED not in game and game.count(FLAG) == len(pokemon_locations)
 
 
@@ -230,23 +339,134 @@ def reveal_cells(game, grid_size, pokemon_locations, index):
     number = number_at_cell(game, pokemon_locations, grid_size, index)
     game = replace_character_at_index(game, index, str(number))
     clear = big_fun_search(game, grid_size, pokemon_locations, index)
+    # write a plain game string through a board so each cell is not a full copy
+    board = game if isinstance(game, BOARD_TYPES) else GameBoard(grid_size, game)
     for i in clear:
-        if game[i] != FLAG:
+        if board[i] != FLAG:
             number = number_at_cell(game, pokemon_locations, grid_size, i)
-            game = replace_character_at_index(game, i, str(number))
+            board[i] = str(number)
 
-    return game
+    return board if board is game else str(board)
+
+
+def reveal_many(game, grid_size, pokemon_locations, indices):
+    """Reveal several cells at once with one flood fill shared between them.
+
+    Gives the same board as calling reveal_cells on each index in turn, but
+    every cell is visited at most once however many of the indices open onto
+    the same region. Flagged indices are left alone, and like reveal_cells the
+    indices should not hide pokemons.
+
+    Parameters:
+        game (str): Game string.
+        grid_size (int): Size of game.
+        pokemon_locations (tuple<int, ...>): Tuple of all Pokemon's locations.
+        indices (iterable<int>): The indices of the cells to reveal.
+
+    Returns:
+        (tuple<str, list<tuple<int, str>>>): The updated game, and the index and
+        new character of every cell that changed.
+    """
+    board = game if isinstance(game, BOARD_TYPES) else GameBoard(grid_size, game)
+    if board.get_pokemon_locations() is pokemon_locations:
+        adjacency = board.get_adjacency()
+    else:
+        adjacency = adjacency_counts(pokemon_locations, grid_size)
+
+    if isinstance(board, ChunkedBoard):
+        visited = set()
+        mark, seen, around = visited.add, visited.__contains__, board.neighbours
+    else:
+        offsets, neighbours = neighbour_table(grid_size)
+        visited = bytearray(grid_size ** 2)
+
+        def mark(index):
+            visited[index] = 1
+
+        seen = visited.__getitem__
+
+        def around(index):
+            return neighbours[offsets[index]:offsets[index + 1]]
+
+    changed = []
+
+    def expose(index):
+        character = str(adjacency[index])
+        if board[index] != character:
+            board[index] = character
+            changed.append((index, character))
+
+    queue = []
+    for index in indices:
+        if seen(index) or board[index] == FLAG:
+            continue
+        mark(index)
+        expose(index)
+        if adjacency[index] == 0:
+            queue.append(index)
+        while queue:
+            node = queue.pop()
+            for neighbour in around(node):
+                if seen(neighbour) or board[neighbour] == FLAG:
+                    continue
+                mark(neighbour)
+                expose(neighbour)
+                if adjacency[neighbour] == 0:
+                    queue.append(neighbour)
+
+    return (board if board is game else str(board)), changed
 
 
 def main():
     """
     Handles player interaction.
     """
+    play()
+
+
+def new_board(grid_size, number_of_pokemons, lazy=False, rng=None):
+    """Make the board for a new game.
+
+    A lazy board has no pokemons until place_pokemons is called on the first
+    reveal, so making one costs nothing more than the empty board.
+
+    Parameters:
+        grid_size (int): The grid size of the game.
+        number_of_pokemons (int): The number of pokemons.
+        lazy (bool): Whether to wait for the first reveal to place the pokemons.
+        rng (int | random.Random): The seed or generator for the pokemons.
+
+    Returns:
+        (tuple<tuple<int, ...>, GameBoard>): The pokemon locations, empty on a
+        lazy board, and the board.
+    """
+    if lazy:
+        return (), GameBoard(grid_size)
+    pokemon_locations = generate_pokemons(grid_size, number_of_pokemons, rng)
+    return pokemon_locations, GameBoard(grid_size, pokemon_locations=pokemon_locations,
+                                        index_regions=True)
+
+
+def play(lazy=False, rng=None, make_recorder=None):
+    """Handles player interaction, optionally placing pokemons on the first reveal.
+
+    Parameters:
+        lazy (bool): Whether to wait for the first reveal to place the
+            pokemons, away from the revealed cell and its neighbours.
+        rng (int | random.Random): The seed or generator for the pokemons,
+            the random module if not given.
+        make_recorder (callable): Called with the grid size and number of
+            pokemons once they are read, returning a recorder such as
+            a1_log.SessionRecorder whose record_action is given every action.
+    """
     grid_size = int(input("Please input the size of the grid: "))
     number_of_pokemons = int(input("Please input the number of pokemons: "))
+    rng = make_rng(rng)
+    recorder = None
+    if make_recorder is not None:
+        recorder = make_recorder(grid_size, number_of_pokemons)
 
-    game = UNEXPOSED * grid_size ** 2
-    pokemon_locations = generate_pokemons(grid_size, number_of_pokemons)
+    pokemon_locations, game = new_board(grid_size, number_of_pokemons, lazy, rng)
 
     while True:
         display_game(game, grid_size)
@@ -256,12 +476,16 @@ def main():
             break
         
         action = input("\nPlease input action: ")
+        if recorder is not None and action != "q":
+            recorder.record_action(action)
 
         if action == "h":
             print(HELP_TEXT)
 
         elif action == "q":
             response = input("You sure about that buddy? (y/n): ")
+            if recorder is not None:
+                recorder.record_action(action, response)
             if response == "y":
                 print("Catch you on the flip side.")
                 break
@@ -272,8 +496,7 @@ def main():
 
         elif action == ":)":
             print("It's rewind time.")
-            game = UNEXPOSED * grid_size ** 2
-            pokemon_locations = generate_pokemons(grid_size, number_of_pokemons)
+            pokemon_locations, game = new_board(grid_size, number_of_pokemons, lazy, rng)
 
         elif action.startswith("f "):
             position = parse_position(action[2:], grid_size)
@@ -291,6 +514,10 @@ def main():
             index = position_to_index(position, grid_size)
             if game[index] == FLAG:
                 continue
+
+            if game.get_pokemon_locations() is None:
+                pokemon_locations = game.place_pokemons(number_of_pokemons, index, rng,
+                                                        index_regions=True)
             
             if index in pokemon_locations:
                 for i in pokemon_locations:
@@ -302,6 +529,104 @@ def main():
             game = reveal_cells(game, grid_size, pokemon_locations, index)
 
 
+def batch_main(lines, output, rng=None, show_boards=False, lazy=False):
+    """Play a scripted game without prompts, writing the results as JSON lines.
+
+    lines holds what main would read from input(): the grid size, the number
+    of pokemons, then the actions, with the answer after each 'q'. Each action
+    writes one JSON object with its result, and the board too if show_boards
+    is set. A last object gives the outcome and the final board. Lines are read
+    one at a time, so they may be streamed from a pipe.
+
+    Parameters:
+        lines (iterable<str>): The input lines.
+        output (file): Where to write the JSON lines.
+        rng (int | random.Random): The seed or generator for the pokemons,
+            the random module if not given, as in main.
+        show_boards (bool): Whether to include the board after every action.
+        lazy (bool): Whether to wait for the first reveal to place the pokemons.
+
+    Returns:
+        (str): "win", "lose", "quit" or None if the actions ran out first.
+    """
+    lines = (line.rstrip("\n") for line in lines)
+    grid_size = int(next(lines))
+    number_of_pokemons = int(next(lines))
+    rng = make_rng(rng)
+    write = output.write
+    encode = json.JSONEncoder(ensure_ascii=False).encode
+    # scripts repeat cells, so parse each action once
+    indices = {}
+
+    pokemon_locations, game = new_board(grid_size, number_of_pokemons, lazy, rng)
+    outcome = "win" if check_win(game, pokemon_locations) else None
+    actions = 0
+
+    for action in lines:
+        if outcome is not None:
+            break
+        actions += 1
+        record = {"action": action}
+
+        if action == "h":
+            record["result"] = "help"
+
+        elif action == "q":
+            response = next(lines, None)
+            record["response"] = response
+            if response == "y":
+                record["result"] = outcome = "quit"
+            else:
+                record["result"] = "continue" if response == "n" else "invalid"
+
+        elif action == ":)":
+            record["result"] = "restart"
+            pokemon_locations, game = new_board(grid_size, number_of_pokemons, lazy, rng)
+
+        else:
+            flag = action.startswith("f ")
+            index = indices.get(action, -1)
+            if index == -1:
+                position = parse_position(action[2:] if flag else action, grid_size)
+                index = indices[action] = (None if position is None
+                                           else position_to_index(position, grid_size))
+            if index is None:
+                record["result"] = "invalid"
+            else:
+                if flag:
+                    if game[index] == FLAG or game[index] == UNEXPOSED:
+                        game = flag_cell(game, index)
+                        record["result"] = "flag" if game[index] == FLAG else "unflag"
+                    else:
+                        record["result"] = "exposed"
+                elif game[index] == FLAG:
+                    record["result"] = "flagged"
+                else:
+                    if game.get_pokemon_locations() is None:
+                        pokemon_locations = game.place_pokemons(
+                            number_of_pokemons, index, rng, index_regions=True)
+                    if index in pokemon_locations:
+                        for i in pokemon_locations:
+                            game = replace_character_at_index(game, i, POKEMON)
+                        record["result"] = outcome = "lose"
+                    else:
+                        hidden = game.get_num_unexposed()
+                        game = reveal_cells(game, grid_size, pokemon_locations, index)
+                        record["result"] = "reveal"
+                        record["revealed"] = hidden - game.get_num_unexposed()
+
+        if outcome is None and check_win(game, pokemon_locations):
+            outcome = "win"
+        if show_boards:
+            record["board"] = str(game)
+        write(encode(record))
+        write("\n")
+
+    write(encode({"outcome": outcome, "actions": actions, "board": str(game)}))
+    write("\n")
+    return outcome
+
+
 def big_fun_search(game, grid_size, pokemon_locations, index):
     """Searching adjacent cells to see if there are any Pokemon"s present.
 
@@ -317,6 +642,9 @@ def big_fun_search(game, grid_size, pokemon_locations, index):
     For cells which have a non-zero value (i.e. cells with neighbour pokemons), only
     the cell itself is revealed.
 
+    A GameBoard with its zero regions indexed answers from the index, unless a
+    flag inside the region means it has to be searched.
+
     Parameters:
         game (str): Game string.
         grid_size (int): Size of game.
@@ -326,24 +654,50 @@ def big_fun_search(game, grid_size, pokemon_locations, index):
     Returns:
         (list<int>): List of cells to turn visible.
     """
-    queue = [index]
-    discovered = [index]
-    visible = []
-
     if game[index] == FLAG:
-        return queue
+        return [index]
 
     number = number_at_cell(game, pokemon_locations, grid_size, index)
     if number != 0:
-        return queue
-
+        return [index]
+
+    if (isinstance(game, BOARD_TYPES)
+            and game.get_pokemon_locations() is pokemon_locations):
+        region = game.reveal_region(index)
+        if region is not None:
+            return [cell for cell in region if cell != index]
+
+    if isinstance(game, ChunkedBoard):
+        # too large for a neighbour table or a visited mask over every cell
+        discovered = {index}
+        queue = [index]
+        visible = []
+        while queue:
+            node = queue.pop()
+            for neighbour in game.neighbours(node):
+                if neighbour in discovered:
+                    continue
+
+                discovered.add(neighbour)
+                if game[neighbour] != FLAG:
+                    number = number_at_cell(game, pokemon_locations, grid_size, neighbour)
+                    if number == 0:
+                        queue.append(neighbour)
+                visible.append(neighbour)
+        return visible
+
+    offsets, neighbours = neighbour_table(grid_size)
+    discovered = bytearray(grid_size ** 2)
+    discovered[index] = 1
+    queue = [index]
+    visible = []
     while queue:
         node = queue.pop()
-        for neighbour in neighbour_directions(node, grid_size):
-            if neighbour in discovered:
+        for neighbour in neighbours[offsets[node]:offsets[node + 1]]:
+            if discovered[neighbour]:
                 continue
 
-            discovered.append(neighbour)
+            discovered[neighbour] = 1
             if game[neighbour] != FLAG:
                 number = number_at_cell(game, pokemon_locations, grid_size, neighbour)
                 if number == 0:
@@ -351,6 +705,20 @@ def big_fun_search(game, grid_size, pokemon_locations, index):
             visible.append(neighbour)
     return visible
 
-
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Play the pokemon game.")
+    parser.add_argument("--batch", nargs="?", const="-", metavar="FILE",
+                        help="play a script of inputs from FILE or stdin, writing JSON lines")
+    parser.add_argument("--seed", type=int, help="seed for the pokemons in batch mode")
+    parser.add_argument("--boards", action="store_true",
+                        help="include the board after every batch action")
+    parser.add_argument("--lazy", action="store_true",
+                        help="place the pokemons on the first reveal, away from that cell")
+    args = parser.parse_args()
+    if args.batch is None:
+        play(args.lazy)
+    elif args.batch == "-":
+        batch_main(sys.stdin, sys.stdout, args.seed, args.boards, args.lazy)
+    else:
+        with open(args.batch, encoding="utf8") as script:
+            batch_main(script, sys.stdout, args.seed, args.boards, args.lazy)
@@ -0,0 +1,187 @@
+import os
+import threading
+import time
+
+from a1_save import read_save, write_save
+
+DELAY = 0.5
+MAX_DELAY = 5.0
+KEEP = 3
+
+
+def autosave_paths(path, keep=KEEP):
+    """Returns the files the autosaves of path rotate through, newest first.
+
+    The newest autosave is path itself and older ones have a number before
+    the extension, e.g. Autosave.a1s, Autosave.1.a1s, Autosave.2.a1s.
+
+    Parameters:
+        path (str): The file of the newest autosave.
+        keep (int): The number of autosaves kept.
+
+    Returns:
+        (list<str>): The paths of the autosaves.
+    """
+    root, extension = os.path.splitext(path)
+    return [path] + [f"{root}.{number}{extension}" for number in range(1, keep)]
+
+
+def read_latest(path, keep=KEEP):
+    """Read the newest autosave that can still be loaded.
+
+    Parameters:
+        path (str): The file of the newest autosave.
+        keep (int): The number of autosaves kept.
+
+    Returns:
+        See a1_save.unpack_game.
+
+    Raises:
+        ValueError: If none of the autosaves can be loaded.
+    """
+    errors = []
+    for autosave in autosave_paths(path, keep):
+        try:
+            return read_save(autosave)
+        except (OSError, ValueError) as error:
+            errors.append(f"{os.path.basename(autosave)}: {error}")
+    raise ValueError("no autosave could be loaded (" + "; ".join(errors) + ")")
+
+
+class Autosaver:
+    """Writes games to rotating autosave files on a background thread.
+
+    schedule() only hands over a snapshot of the game, so the caller never
+    waits on the disk. Snapshots scheduled in quick succession are coalesced:
+    the worker writes the latest one once no new snapshot has come for delay
+    seconds, or max_delay seconds after the first one still waiting, so a
+    steady stream of moves is still saved.
+    """
+
+    def __init__(self, path, keep=KEEP, delay=DELAY, max_delay=MAX_DELAY):
+        """
+        Parameters:
+            path (str): The file of the newest autosave.
+            keep (int): The number of autosaves kept, at least one.
+            delay (float): Seconds without a new snapshot before writing.
+            max_delay (float): Most seconds a snapshot waits to be written.
+        """
+        if keep < 1:
+            raise ValueError("at least one autosave must be kept")
+        self._paths = autosave_paths(path, keep)
+        self._delay = delay
+        self._max_delay = max_delay
+        self._condition = threading.Condition()
+        self._pending = None
+        self._first = self._last = 0.0
+        self._writing = False
+        self._hurry = False
+        self._closed = False
+        self._num_writes = 0
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self._thread.start()
+
+    def get_paths(self):
+        """Returns the autosave files, newest first."""
+        return list(self._paths)
+
+    def get_num_writes(self):
+        """Returns the number of autosaves written so far."""
+        return self._num_writes
+
+    def pop_error(self):
+        """Returns the error of the last failed write, or None, and forgets it."""
+        with self._condition:
+            error, self._error = self._error, None
+        return error
+
+    def schedule(self, game, grid_size, number_of_pokemons, pokemon_locations=None,
+                 seed=None):
+        """Hand a game to the worker to be saved, replacing any still waiting.
+
+        The game must not change afterwards, e.g. a copy of the board.
+
+        Parameters:
+            See a1_save.pack_game.
+        """
+        now = time.monotonic()
+        with self._condition:
+            if self._closed:
+                raise ValueError("the autosaver is closed")
+            if self._pending is None:
+                self._first = now
+            self._pending = (game, grid_size, number_of_pokemons, pokemon_locations, seed)
+            self._last = now
+            self._condition.notify_all()
+
+    def flush(self, timeout=None):
+        """Write any waiting snapshot now and wait for it to be on disk.
+
+        Parameters:
+            timeout (float): Most seconds to wait, None to wait until done.
+
+        Returns:
+            (bool): True if nothing is left to write.
+        """
+        with self._condition:
+            self._hurry = True
+            self._condition.notify_all()
+            done = self._condition.wait_for(
+                lambda: self._pending is None and not self._writing, timeout)
+            self._hurry = False
+            return done
+
+    def close(self, timeout=None):
+        """Flush the waiting snapshot and stop the worker.
+
+        Parameters:
+            timeout (float): Most seconds to wait for the last write.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+
+    def _next(self):
+        """Wait for the next snapshot that is due, None once closed and flushed."""
+        with self._condition:
+            while True:
+                if self._pending is None:
+                    if self._closed:
+                        return None
+                    self._condition.wait()
+                    continue
+                due = min(self._last + self._delay, self._first + self._max_delay)
+                remaining = due - time.monotonic()
+                if remaining <= 0 or self._hurry or self._closed:
+                    snapshot, self._pending = self._pending, None
+                    self._writing = True
+                    return snapshot
+                self._condition.wait(remaining)
+
+    def _run(self):
+        while True:
+            snapshot = self._next()
+            if snapshot is None:
+                return
+            error = None
+            try:
+                self._write(*snapshot)
+            except (OSError, ValueError) as caught:
+                error = caught
+            with self._condition:
+                self._writing = False
+                if error is None:
+                    self._num_writes += 1
+                else:
+                    self._error = error
+                self._condition.notify_all()
+
+    def _write(self, game, grid_size, number_of_pokemons, pokemon_locations, seed):
+        """Move every autosave one place older and write the game as the newest."""
+        for older, newer in zip(reversed(self._paths[1:]), reversed(self._paths[:-1])):
+            if os.path.exists(newer):
+                os.replace(newer, older)
+        write_save(self._paths[0], game, grid_size, number_of_pokemons,
+                   pokemon_locations, seed)
@@ -0,0 +1,293 @@
+import argparse
+import contextlib
+import io
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from a1_support import *
+import a1
+from a1 import (big_fun_search, check_win, display_game, number_at_cell,
+                reveal_cells)
+from a1_board import GameBoard, neighbour_table
+from a1_solver import solve
+
+
+def best_time(function, *args, repeat=3):
+    """Time a call several times and keep the fastest run.
+
+    Parameters:
+        function (callable): The function to time.
+        *args: The arguments to call it with.
+        repeat (int): How many times to run the call.
+
+    Returns:
+        (float): The fastest run in seconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_flood_fill(sizes=(50, 100, 200, 300)):
+    """Time revealing a board with no pokemons from its top left cell.
+
+    Every cell is part of the one zero region, so the region grows with the
+    board and the time per revealed cell should stay flat.
+
+    Parameters:
+        sizes (tuple<int, ...>): The grid sizes to time.
+
+    Returns:
+        (list<tuple<int, int, float, float>>): The grid size, cells revealed,
+        seconds for big_fun_search and seconds for reveal_cells on a GameBoard.
+    """
+    results = []
+    for grid_size in sizes:
+        pokemon_locations = PokemonLocations((), grid_size ** 2)
+        neighbour_table(grid_size)
+        game = UNEXPOSED * grid_size ** 2
+        search = best_time(big_fun_search, game, grid_size, pokemon_locations, 0)
+        reveal = best_time(
+            lambda: reveal_cells(GameBoard(grid_size, pokemon_locations=pokemon_locations),
+                                 grid_size, pokemon_locations, 0))
+        results.append((grid_size, grid_size ** 2, search, reveal))
+    return results
+
+
+def bench_main(grid_size=1000, number_of_pokemons=1000, moves=5, seed=1001):
+    """Time the interactive main loop playing a large board from a script.
+
+    Parameters:
+        grid_size (int): The grid size of the game.
+        number_of_pokemons (int): The number of pokemons.
+        moves (int): The number of cells to flag before quitting.
+        seed (int): The seed for the pokemon locations.
+
+    Returns:
+        (float): Seconds taken to play the script.
+    """
+    labels = row_labels(grid_size)[0]
+    rng = random.Random(seed)
+    actions = [f"f {labels[rng.randrange(grid_size)]}{rng.randrange(grid_size) + 1}"
+               for _ in range(moves)]
+    script = "\n".join([str(grid_size), str(number_of_pokemons)] + actions + ["q", "y"])
+
+    stdin, stdout = sys.stdin, sys.stdout
+    sys.stdin, sys.stdout = io.StringIO(script + "\n"), io.StringIO()
+    random.seed(seed)
+    try:
+        start = time.perf_counter()
+        a1.main()
+        return time.perf_counter() - start
+    finally:
+        sys.stdin, sys.stdout = stdin, stdout
+
+
+def bench_solver(boards=500, grid_size=16, number_of_pokemons=40, seed=1001):
+    """Time the solver on boards just after their first reveal.
+
+    Each board is opened on a cell with no pokemons around it, which is where
+    the frontier is longest and the solver does the most work.
+
+    Parameters:
+        boards (int): The number of boards to solve.
+        grid_size (int): The grid size of the game.
+        number_of_pokemons (int): The number of pokemons.
+        seed (int): The seed for the boards.
+
+    Returns:
+        (tuple<int, float>): The boards solved and the seconds taken.
+    """
+    games = []
+    for board_seed in child_seeds(seed, boards):
+        pokemon_locations = generate_pokemons(grid_size, number_of_pokemons, board_seed)
+        game = GameBoard(grid_size, pokemon_locations=pokemon_locations, index_regions=True)
+        adjacency = game.get_adjacency()
+        openings = [index for index in range(grid_size ** 2)
+                    if adjacency[index] == 0 and index not in pokemon_locations]
+        if openings:
+            reveal_cells(game, grid_size, pokemon_locations, openings[0])
+            games.append(str(game))
+
+    start = time.perf_counter()
+    for game in games:
+        solve(game, grid_size, number_of_pokemons)
+    return len(games), time.perf_counter() - start
+
+
+SUITE_SIZES = (10, 100, 1000)
+SUITE_DENSITIES = (0.05, 0.15)
+
+
+def measure(function, min_time=0.2):
+    """Measure how often a call can run per second and the memory it peaks at.
+
+    The call is repeated until min_time has passed. Memory is measured on one
+    more call with tracemalloc running, since tracing slows every allocation.
+
+    Parameters:
+        function (callable): The call to measure, taking no arguments.
+        min_time (float): The least time in seconds to keep calling it for.
+
+    Returns:
+        (dict<str, float>): The calls per second and peak memory in KiB.
+    """
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        function()
+        calls += 1
+        seconds = time.perf_counter() - start
+        if seconds >= min_time:
+            break
+
+    tracemalloc.start()
+    try:
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"ops_per_second": calls / seconds, "peak_kib": peak / 1024}
+
+
+def _engine_calls(grid_size, density, seed):
+    """Set up a board and the call to measure for each engine function.
+
+    Returns:
+        (dict<str, callable>): The calls, by function name.
+    """
+    number_of_pokemons = max(1, int(density * grid_size ** 2))
+    pokemon_locations = generate_pokemons(grid_size, number_of_pokemons, seed)
+    game = GameBoard(grid_size, pokemon_locations=pokemon_locations, index_regions=True)
+    adjacency = game.get_adjacency()
+    opening = next((index for index in range(grid_size ** 2)
+                    if adjacency[index] == 0 and index not in pokemon_locations), 0)
+    middle = grid_size ** 2 // 2 + grid_size // 2
+    played = reveal_cells(game.copy(), grid_size, pokemon_locations, opening)
+
+    def display():
+        with contextlib.redirect_stdout(io.StringIO()):
+            display_game(played, grid_size)
+
+    return {
+        "generate_pokemons": lambda: generate_pokemons(grid_size, number_of_pokemons, seed),
+        "number_at_cell": lambda: number_at_cell(game, pokemon_locations, grid_size, middle),
+        "big_fun_search": lambda: big_fun_search(game, grid_size, pokemon_locations, opening),
+        # includes copying the board, since revealing changes it
+        "reveal_cells": lambda: reveal_cells(game.copy(), grid_size, pokemon_locations, opening),
+        "check_win": lambda: check_win(played, pokemon_locations),
+        "display_game": display,
+    }
+
+
+def bench_engine(sizes=SUITE_SIZES, densities=SUITE_DENSITIES, seed=1001, min_time=0.2):
+    """Measure each engine function across grid sizes and pokemon densities.
+
+    Parameters:
+        sizes (tuple<int, ...>): The grid sizes to measure.
+        densities (tuple<float, ...>): The share of cells holding a pokemon.
+        seed (int): The seed for the pokemon locations.
+        min_time (float): The least time in seconds to measure each call for.
+
+    Returns:
+        (dict<str, dict<str, float>>): The measurements, keyed by
+        "function/grid size/density".
+    """
+    results = {}
+    for grid_size in sizes:
+        for density in densities:
+            for name, call in _engine_calls(grid_size, density, seed).items():
+                results[f"{name}/{grid_size}/{density}"] = measure(call, min_time)
+    return results
+
+
+def compare(results, baseline, budget=20.0):
+    """Find the measurements that got worse than a baseline allows.
+
+    A measurement regresses when its calls per second drop, or its peak memory
+    grows, by more than budget percent. Measurements missing from either side
+    are left out.
+
+    Parameters:
+        results (dict<str, dict<str, float>>): The new measurements.
+        baseline (dict<str, dict<str, float>>): The measurements to compare to.
+        budget (float): The percentage each measurement may get worse by.
+
+    Returns:
+        (list<str>): A description of each regression.
+    """
+    regressions = []
+    allowed = budget / 100
+    for key in sorted(results.keys() & baseline.keys()):
+        new, old = results[key], baseline[key]
+        if new["ops_per_second"] < old["ops_per_second"] * (1 - allowed):
+            regressions.append(f"{key}: {new['ops_per_second']:.4g} ops/s, "
+                               f"was {old['ops_per_second']:.4g}")
+        if new["peak_kib"] > old["peak_kib"] * (1 + allowed) + 1:
+            regressions.append(f"{key}: {new['peak_kib']:.1f} KiB peak, "
+                               f"was {old['peak_kib']:.1f}")
+    return regressions
+
+
+def run_suite(baseline=None, save=None, budget=20.0, min_time=0.2):
+    """Run the engine suite, print it and check it against a baseline file.
+
+    Parameters:
+        baseline (str): A JSON file of earlier results to compare to, if any.
+        save (str): A JSON file to write these results to, if any.
+        budget (float): The percentage each measurement may get worse by.
+        min_time (float): The least time in seconds to measure each call for.
+
+    Returns:
+        (int): 1 if anything regressed, 0 otherwise.
+    """
+    results = bench_engine(min_time=min_time)
+    print(f"{'benchmark':<32} {'ops/s':>12} {'peak KiB':>10}")
+    for key, result in results.items():
+        print(f"{key:<32} {result['ops_per_second']:>12.4g} {result['peak_kib']:>10.1f}")
+    if save is not None:
+        with open(save, "w") as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+
+    if baseline is None:
+        return 0
+    with open(baseline) as file:
+        regressions = compare(results, json.load(file), budget)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+def main():
+    """Print the benchmarks, or run the engine suite with --suite."""
+    parser = argparse.ArgumentParser(description="Benchmark the a1 game engine.")
+    parser.add_argument("--suite", action="store_true",
+                        help="measure every engine function across sizes and densities")
+    parser.add_argument("--baseline", help="JSON results to fail against")
+    parser.add_argument("--save", help="write the suite results to this JSON file")
+    parser.add_argument("--budget", type=float, default=20.0,
+                        help="percentage a result may regress by (default 20)")
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="seconds to measure each call for (default 0.2)")
+    args = parser.parse_args()
+    if args.suite or args.baseline or args.save:
+        sys.exit(run_suite(args.baseline, args.save, args.budget, args.min_time))
+
+    print(f"{'grid':>6} {'cells':>8} {'search s':>10} {'us/cell':>8} "
+          f"{'reveal s':>10} {'us/cell':>8}")
+    for grid_size, cells, search, reveal in bench_flood_fill():
+        print(f"{grid_size:>6} {cells:>8} {search:>10.4f} {search / cells * 1e6:>8.3f} "
+              f"{reveal:>10.4f} {reveal / cells * 1e6:>8.3f}")
+    print(f"main loop, 1000x1000 board, 5 moves: {bench_main():.2f}s")
+    solved, seconds = bench_solver()
+    print(f"solver, 16x16 boards, 40 pokemons: {solved / seconds:.0f} boards/s")
+
+
+if __name__ == "__main__":
+    main()
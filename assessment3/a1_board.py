@@ -0,0 +1,719 @@
+import random
+from array import array
+from functools import lru_cache
+
+from a1_support import *
+
+# Cells are stored as single ASCII bytes, the two non-ASCII symbols are given
+# stand-in letters and translated back only when a string is requested.
+_ENCODE = str.maketrans({FLAG: "F", POKEMON: "P"})
+_DECODE = str.maketrans({"F": FLAG, "P": POKEMON})
+_CELL_CODE = {character: ord(character.translate(_ENCODE))
+              for character in UNEXPOSED + FLAG + POKEMON + "0123456789"}
+_CELL_CHARACTER = {code: character for character, code in _CELL_CODE.items()}
+_FLAG_CODE = _CELL_CODE[FLAG]
+_UNEXPOSED_CODE = _CELL_CODE[UNEXPOSED]
+
+
+def _direction_step(direction):
+    """Returns the (row, column) step taken when moving in a direction.
+
+    Parameters:
+        direction (str): One of the DIRECTIONS strings.
+
+    Returns:
+        (tuple<int, int>): The change in row and column.
+    """
+    row = -1 if UP in direction else 1 if DOWN in direction else 0
+    col = 1 if RIGHT in direction else -1 if LEFT in direction else 0
+    return row, col
+
+
+_DIRECTION_STEPS = tuple(_direction_step(direction) for direction in DIRECTIONS)
+
+
+@lru_cache(maxsize=4)
+def neighbour_table(grid_size):
+    """Build the neighbour indices of every cell for a grid size.
+
+    The table is stored flat: the neighbours of cell i are
+    neighbours[offsets[i]:offsets[i + 1]], listed in DIRECTIONS order.
+    Tables are cached so each grid size is only built once.
+
+    Parameters:
+        grid_size (int): The grid size of the game.
+
+    Returns:
+        (tuple<array, array>): The offsets and neighbours arrays.
+    """
+    offsets = array("i", [0])
+    neighbours = array("i")
+    middle_bytes = neighbours.itemsize * (grid_size - 2)
+    for row in range(grid_size):
+        steps = [(d_col, d_row * grid_size + d_col)
+                 for d_row, d_col in _DIRECTION_STEPS
+                 if 0 <= row + d_row < grid_size]
+        start = row * grid_size
+        neighbours.extend(start + delta for d_col, delta in steps
+                          if 0 <= d_col < grid_size)
+        offsets.append(len(neighbours))
+        if grid_size > 2:
+            # Cells between the first and last column share the same
+            # offsets, so fill them a whole direction at a time.
+            width = len(steps)
+            middle = array("i", bytes(middle_bytes * width))
+            for k, (_, delta) in enumerate(steps):
+                middle[k::width] = array("i", range(start + 1 + delta,
+                                                    start + grid_size - 1 + delta))
+            neighbours.extend(middle)
+            offsets.extend(range(offsets[-1] + width, len(neighbours) + 1, width))
+        if grid_size > 1:
+            end = start + grid_size - 1
+            neighbours.extend(end + delta for d_col, delta in steps if d_col <= 0)
+            offsets.append(len(neighbours))
+    return offsets, neighbours
+
+
+def neighbours_of(index, grid_size):
+    """Returns the indices of the cells next to index, in DIRECTIONS order.
+
+    Parameters:
+        index (int): The index in the game string.
+        grid_size (int): The grid size of the game.
+
+    Returns:
+        (array<int>): The neighbouring indices.
+    """
+    offsets, neighbours = neighbour_table(grid_size)
+    return neighbours[offsets[index]:offsets[index + 1]]
+
+
+def adjacency_counts(pokemon_locations, grid_size):
+    """Count the pokemons next to every cell in a single pass over the pokemons.
+
+    Parameters:
+        pokemon_locations (tuple<int, ...>): Where the pokemons are hidden.
+        grid_size (int): The grid size of the game.
+
+    Returns:
+        (bytearray): The number of neighbouring pokemons, indexed like the game string.
+    """
+    offsets, neighbours = neighbour_table(grid_size)
+    counts = bytearray(grid_size ** 2)
+    for location in pokemon_locations:
+        for neighbour in neighbours[offsets[location]:offsets[location + 1]]:
+            counts[neighbour] += 1
+    return counts
+
+
+class RevealIndex:
+    """The connected zero regions of a board and the numbered cells around them.
+
+    Built once when the pokemons are placed, so revealing a zero cell becomes a
+    lookup of its region instead of a search. A flag on a zero cell can cut its
+    region in two, so regions holding a flagged zero cell are blocked and the
+    caller has to search instead.
+    """
+
+    def __init__(self, adjacency, grid_size):
+        """
+        Label every zero region of a board.
+
+        Parameters:
+            adjacency (bytearray): The number of neighbouring pokemons of every cell.
+            grid_size (int): The grid size of the game.
+        """
+        offsets, neighbours = neighbour_table(grid_size)
+        region_of = array("i", [-1]) * len(adjacency)
+        border_of = array("i", [-1]) * len(adjacency)
+        regions = []
+
+        start = adjacency.find(0)
+        while start != -1:
+            if region_of[start] < 0:
+                region = len(regions)
+                region_of[start] = region
+                cells = [start]
+                queue = [start]
+                while queue:
+                    node = queue.pop()
+                    for neighbour in neighbours[offsets[node]:offsets[node + 1]]:
+                        if adjacency[neighbour]:
+                            if border_of[neighbour] != region:
+                                border_of[neighbour] = region
+                                cells.append(neighbour)
+                        elif region_of[neighbour] < 0:
+                            region_of[neighbour] = region
+                            cells.append(neighbour)
+                            queue.append(neighbour)
+                regions.append(cells)
+            start = adjacency.find(0, start + 1)
+
+        self._region_of = region_of
+        self._regions = regions
+        self._blocked = array("i", [0]) * len(regions)
+
+    def copy(self):
+        """Returns an index sharing these regions with its own flag records."""
+        index = RevealIndex.__new__(RevealIndex)
+        index._region_of = self._region_of
+        index._regions = self._regions
+        index._blocked = array("i", self._blocked)
+        return index
+
+    def flag_changed(self, index, change):
+        """Record a flag being placed on or removed from a cell.
+
+        Parameters:
+            index (int): The index of the cell.
+            change (int): 1 if a flag was placed, -1 if it was removed.
+        """
+        region = self._region_of[index]
+        if region >= 0:
+            self._blocked[region] += change
+
+    def clear_flags(self):
+        """Forget every flag, e.g. when the board is covered again."""
+        self._blocked = array("i", [0]) * len(self._regions)
+
+    def region(self, index):
+        """Returns every cell revealed by selecting a zero cell.
+
+        Parameters:
+            index (int): The index of the selected cell.
+
+        Returns:
+            (list<int>): The zero region holding index and its numbered border,
+            or None if index is not a zero cell or a flag blocks its region.
+        """
+        region = self._region_of[index]
+        if region < 0 or self._blocked[region]:
+            return None
+        return self._regions[region]
+
+
+class GameBoard:
+    """A mutable game board that stores one byte per cell.
+
+    Cells can be read and written in place by index, so a move no longer has to
+    copy the whole game string. The board behaves like the game string for
+    indexing, membership, count and comparison, and str() gives the usual
+    game string.
+
+    The board keeps count of its unexposed cells, flags and flags on pokemons
+    as cells are written, so checking for a win does not scan the board.
+    """
+
+    def __init__(self, grid_size, game=None, pokemon_locations=None,
+                 index_regions=False):
+        """
+        Construct a board, all unexposed unless a game string is given.
+
+        Parameters:
+            grid_size (int): The grid size of the game.
+            game (str): The game string to start from.
+            pokemon_locations (tuple<int, ...>): Where the pokemons are hidden.
+            index_regions (bool): Whether to label the zero regions for reveals.
+        """
+        if game is None:
+            game = UNEXPOSED * grid_size ** 2
+        self._grid_size = grid_size
+        self._cells = bytearray(str(game).translate(_ENCODE), "ascii")
+        self._num_unexposed = self._cells.count(_UNEXPOSED_CODE)
+        self._num_flags = self._cells.count(_FLAG_CODE)
+        self._num_correct_flags = 0
+        self._pokemon_locations = None
+        self._pokemon_mask = None
+        self._adjacency = None
+        self._reveal_index = None
+        if pokemon_locations is not None:
+            self.set_pokemon_locations(pokemon_locations, index_regions)
+
+    def get_grid_size(self):
+        """Returns the grid size of the board."""
+        return self._grid_size
+
+    def get_pokemon_locations(self):
+        """Returns the pokemon locations placed on the board, or None."""
+        return self._pokemon_locations
+
+    def get_num_unexposed(self):
+        """Returns the number of cells that are still unexposed."""
+        return self._num_unexposed
+
+    def get_num_flags(self):
+        """Returns the number of flagged cells."""
+        return self._num_flags
+
+    def get_num_correct_flags(self):
+        """Returns the number of flagged cells hiding a pokemon."""
+        return self._num_correct_flags
+
+    def get_adjacency(self):
+        """Returns the number of neighbouring pokemons for every cell, or None."""
+        return self._adjacency
+
+    def set_pokemon_locations(self, pokemon_locations, index_regions=False):
+        """Place pokemons on the board and count the pokemons around every cell.
+
+        Parameters:
+            pokemon_locations (tuple<int, ...>): Where the pokemons are hidden.
+            index_regions (bool): Whether to label the zero regions for reveals.
+        """
+        mask = pokemon_locations
+        if not isinstance(mask, PokemonLocations):
+            mask = PokemonLocations(pokemon_locations, len(self._cells))
+        self._use_pokemons(pokemon_locations, mask,
+                           adjacency_counts(pokemon_locations, self._grid_size),
+                           index_regions)
+
+    def place_pokemons(self, number_of_pokemons, first_click, rng=None, index_regions=False):
+        """Hide pokemons anywhere except first_click and its neighbours.
+
+        This lets a board be made without pokemons and have them placed when
+        the first cell is revealed, so that cell always opens up. The
+        neighbour counts are built while the pokemons are drawn.
+
+        Parameters:
+            number_of_pokemons (int): The number of pokemons to hide.
+            first_click (int): The index of the first cell revealed.
+            rng (int | random.Random): The seed or generator to draw from, the
+                shared module level generator if not given.
+            index_regions (bool): Whether to label the zero regions for reveals.
+
+        Returns:
+            (PokemonLocations): Where the pokemons were hidden.
+        """
+        rng = make_rng(rng)
+        cell_count = len(self._cells)
+        offsets, neighbours = neighbour_table(self._grid_size)
+        excluded = bytearray(cell_count)
+        excluded[first_click] = 1
+        for neighbour in neighbours[offsets[first_click]:offsets[first_click + 1]]:
+            excluded[neighbour] = 1
+        free = cell_count - excluded.count(1)
+        number_of_pokemons = max(0, min(number_of_pokemons, free))
+
+        if 2 * number_of_pokemons <= free:
+            randrange = rng.randrange
+            drawn = []
+            for _ in range(number_of_pokemons):
+                index = randrange(cell_count)
+                while excluded[index]:
+                    index = randrange(cell_count)
+                excluded[index] = 1
+                drawn.append(index)
+        else:
+            drawn = rng.sample([index for index in range(cell_count) if not excluded[index]],
+                               number_of_pokemons)
+
+        mask = bytearray((cell_count + 7) // 8)
+        adjacency = bytearray(cell_count)
+        for location in drawn:
+            mask[location >> 3] |= 1 << (location & 7)
+            for neighbour in neighbours[offsets[location]:offsets[location + 1]]:
+                adjacency[neighbour] += 1
+        pokemon_locations = PokemonLocations.from_mask(drawn, mask)
+        self._use_pokemons(pokemon_locations, pokemon_locations, adjacency, index_regions)
+        return pokemon_locations
+
+    def _use_pokemons(self, pokemon_locations, mask, adjacency, index_regions):
+        """Take on pokemons whose membership mask and neighbour counts are built."""
+        self._pokemon_locations = pokemon_locations
+        self._pokemon_mask = mask
+        self._num_correct_flags = sum(self._cells[location] == _FLAG_CODE
+                                      for location in pokemon_locations)
+        self._adjacency = adjacency
+        self._reveal_index = None
+        if index_regions:
+            self._reveal_index = RevealIndex(self._adjacency, self._grid_size)
+            flag = self._cells.find(_FLAG_CODE)
+            while flag != -1:
+                self._reveal_index.flag_changed(flag, 1)
+                flag = self._cells.find(_FLAG_CODE, flag + 1)
+
+    def reveal_region(self, index):
+        """Returns every cell revealed by selecting a zero cell, if indexed.
+
+        Parameters:
+            index (int): The index of the selected cell.
+
+        Returns:
+            (list<int>): The cells to reveal, or None when the board has no
+            region index or the region has to be searched.
+        """
+        if self._reveal_index is None:
+            return None
+        return self._reveal_index.region(index)
+
+    def reset(self):
+        """Cover every cell again, keeping the pokemons where they are."""
+        self._cells[:] = bytes([_UNEXPOSED_CODE]) * len(self._cells)
+        self._num_unexposed = len(self._cells)
+        self._num_flags = 0
+        self._num_correct_flags = 0
+        if self._reveal_index is not None:
+            self._reveal_index.clear_flags()
+
+    def copy(self, index_regions=True):
+        """Returns an independent copy of the board.
+
+        Parameters:
+            index_regions (bool): Whether to copy the zero region labels too.
+                A copy that is only read, e.g. to be saved, can leave them out.
+        """
+        board = GameBoard.__new__(GameBoard)
+        board._grid_size = self._grid_size
+        board._cells = bytearray(self._cells)
+        board._num_unexposed = self._num_unexposed
+        board._num_flags = self._num_flags
+        board._num_correct_flags = self._num_correct_flags
+        board._pokemon_locations = self._pokemon_locations
+        board._pokemon_mask = self._pokemon_mask
+        board._adjacency = self._adjacency
+        board._reveal_index = None
+        if index_regions and self._reveal_index is not None:
+            board._reveal_index = self._reveal_index.copy()
+        return board
+
+    def __len__(self):
+        return len(self._cells)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._cells[index].decode("ascii").translate(_DECODE)
+        return _CELL_CHARACTER[self._cells[index]]
+
+    def __setitem__(self, index, character):
+        code = _CELL_CODE[character]
+        old = self._cells[index]
+        if old == code:
+            return
+        self._cells[index] = code
+        if old == _UNEXPOSED_CODE:
+            self._num_unexposed -= 1
+        elif old == _FLAG_CODE:
+            self._flag_changed(index, -1)
+        if code == _UNEXPOSED_CODE:
+            self._num_unexposed += 1
+        elif code == _FLAG_CODE:
+            self._flag_changed(index, 1)
+
+    def _flag_changed(self, index, change):
+        """Update the flag counts after a flag is placed or removed.
+
+        Parameters:
+            index (int): The index of the cell.
+            change (int): 1 if a flag was placed, -1 if it was removed.
+        """
+        self._num_flags += change
+        if self._pokemon_mask is not None and index in self._pokemon_mask:
+            self._num_correct_flags += change
+        if self._reveal_index is not None:
+            self._reveal_index.flag_changed(index, change)
+
+    def __iter__(self):
+        return iter(str(self))
+
+    def __contains__(self, character):
+        code = _CELL_CODE.get(character)
+        if code == _UNEXPOSED_CODE:
+            return self._num_unexposed > 0
+        if code == _FLAG_CODE:
+            return self._num_flags > 0
+        return code is not None and code in self._cells
+
+    def count(self, character):
+        """Returns the number of cells holding the given character.
+
+        Parameters:
+            character (str): The cell character to count.
+        """
+        code = _CELL_CODE.get(character)
+        if code == _UNEXPOSED_CODE:
+            return self._num_unexposed
+        if code == _FLAG_CODE:
+            return self._num_flags
+        if code is None:
+            return 0
+        return self._cells.count(code)
+
+    def __eq__(self, other):
+        if isinstance(other, GameBoard):
+            return self._cells == other._cells
+        if isinstance(other, str):
+            return str(self) == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __str__(self):
+        return self._cells.decode("ascii").translate(_DECODE)
+
+    def __repr__(self):
+        return f"GameBoard({self._grid_size}, {str(self)!r})"
+
+
+CHUNK_SIZE = 64
+
+
+class ChunkedPokemons:
+    """The pokemons of a chunked board, placed one chunk at a time.
+
+    The pokemons in a chunk are drawn from a generator seeded with a hash of
+    the board seed and the chunk coordinates, so a chunk gets the same pokemons
+    whenever, and in whatever order, chunks are first looked at. Works like
+    pokemon_locations for membership, len and iteration, though iterating
+    places the pokemons of every chunk.
+    """
+
+    def __init__(self, grid_size, density, seed):
+        """
+        Parameters:
+            grid_size (int): The grid size of the game.
+            density (float): The fraction of cells hiding a pokemon.
+            seed (int | str): The seed of the board.
+        """
+        self._grid_size = grid_size
+        self._density = density
+        self._seed = seed
+        self._masks = {}
+
+    def _chunk_shape(self, chunk):
+        """Returns the (height, width) of a chunk, smaller along the far edges."""
+        chunk_row, chunk_col = chunk
+        return (min(CHUNK_SIZE, self._grid_size - chunk_row * CHUNK_SIZE),
+                min(CHUNK_SIZE, self._grid_size - chunk_col * CHUNK_SIZE))
+
+    def chunk_count(self, chunk):
+        """Returns the number of pokemons in a chunk, without placing them.
+
+        Parameters:
+            chunk (tuple<int, int>): The chunk's row and column.
+        """
+        height, width = self._chunk_shape(chunk)
+        return round(self._density * height * width)
+
+    def chunk_mask(self, chunk):
+        """Returns the bitset of pokemons in a chunk, placing them the first time.
+
+        Parameters:
+            chunk (tuple<int, int>): The chunk's row and column.
+
+        Returns:
+            (bytearray): One bit per cell, indexed by row * CHUNK_SIZE + column
+            within the chunk.
+        """
+        mask = self._masks.get(chunk)
+        if mask is None:
+            height, width = self._chunk_shape(chunk)
+            rng = random.Random(derive_seed(self._seed, *chunk))
+            mask = bytearray(CHUNK_SIZE ** 2 // 8)
+            for cell in rng.sample(range(height * width), self.chunk_count(chunk)):
+                local = cell // width * CHUNK_SIZE + cell % width
+                mask[local >> 3] |= 1 << (local & 7)
+            self._masks[chunk] = mask
+        return mask
+
+    def chunks(self):
+        """Returns the coordinates of every chunk on the board."""
+        count = -(-self._grid_size // CHUNK_SIZE)
+        return [(chunk_row, chunk_col) for chunk_row in range(count)
+                for chunk_col in range(count)]
+
+    def __contains__(self, index):
+        if not isinstance(index, int) or not 0 <= index < self._grid_size ** 2:
+            return False
+        row, col = divmod(index, self._grid_size)
+        mask = self.chunk_mask((row // CHUNK_SIZE, col // CHUNK_SIZE))
+        local = row % CHUNK_SIZE * CHUNK_SIZE + col % CHUNK_SIZE
+        return bool(mask[local >> 3] >> (local & 7) & 1)
+
+    def __len__(self):
+        return sum(self.chunk_count(chunk) for chunk in self.chunks())
+
+    def __iter__(self):
+        for chunk in self.chunks():
+            mask = self.chunk_mask(chunk)
+            top = chunk[0] * CHUNK_SIZE * self._grid_size + chunk[1] * CHUNK_SIZE
+            for local in range(CHUNK_SIZE ** 2):
+                if mask[local >> 3] >> (local & 7) & 1:
+                    yield top + local // CHUNK_SIZE * self._grid_size + local % CHUNK_SIZE
+
+
+class ChunkedAdjacency:
+    """The number of pokemons next to each cell of a chunked board, counted on demand."""
+
+    def __init__(self, board):
+        """
+        Parameters:
+            board (ChunkedBoard): The board to count on.
+        """
+        self._board = board
+
+    def __getitem__(self, index):
+        pokemon_locations = self._board.get_pokemon_locations()
+        return sum(neighbour in pokemon_locations
+                   for neighbour in self._board.neighbours(index))
+
+
+class ChunkedBoard:
+    """A board that only stores the 64x64 chunks of cells that have been written.
+
+    Untouched cells read as unexposed, and pokemons are placed chunk by chunk
+    as they are needed, so memory grows with how much of the board has been
+    explored rather than with its size. Supports the same cell access and
+    running counts as GameBoard, and the a1 functions work on it directly.
+    """
+
+    def __init__(self, grid_size, density=0.15, seed=None):
+        """
+        Parameters:
+            grid_size (int): The grid size of the game.
+            density (float): The fraction of cells hiding a pokemon.
+            seed (int | str): The seed of the board, random if not given.
+        """
+        if seed is None:
+            seed = random.getrandbits(64)
+        self._grid_size = grid_size
+        self._seed = seed
+        self._pokemon_locations = ChunkedPokemons(grid_size, density, seed)
+        self._adjacency = ChunkedAdjacency(self)
+        self._chunks = {}
+        self._num_unexposed = grid_size ** 2
+        self._num_flags = 0
+        self._num_correct_flags = 0
+
+    def get_grid_size(self):
+        """Returns the grid size of the board."""
+        return self._grid_size
+
+    def get_seed(self):
+        """Returns the seed the pokemons are placed from."""
+        return self._seed
+
+    def get_pokemon_locations(self):
+        """Returns the pokemons of the board."""
+        return self._pokemon_locations
+
+    def get_adjacency(self):
+        """Returns the number of neighbouring pokemons for every cell."""
+        return self._adjacency
+
+    def get_num_chunks(self):
+        """Returns the number of chunks of cells allocated so far."""
+        return len(self._chunks)
+
+    def get_num_unexposed(self):
+        """Returns the number of cells that are still unexposed."""
+        return self._num_unexposed
+
+    def get_num_flags(self):
+        """Returns the number of flagged cells."""
+        return self._num_flags
+
+    def get_num_correct_flags(self):
+        """Returns the number of flagged cells hiding a pokemon."""
+        return self._num_correct_flags
+
+    def reveal_region(self, index):
+        """Chunked boards have no region index, so reveals always search."""
+        return None
+
+    def neighbours(self, index):
+        """Returns the indices of the cells next to index, in DIRECTIONS order.
+
+        Parameters:
+            index (int): The index of the cell.
+        """
+        grid_size = self._grid_size
+        row, col = divmod(index, grid_size)
+        return [index + d_row * grid_size + d_col for d_row, d_col in _DIRECTION_STEPS
+                if 0 <= row + d_row < grid_size and 0 <= col + d_col < grid_size]
+
+    def reset(self):
+        """Cover every cell again, keeping the pokemons where they are."""
+        self._chunks.clear()
+        self._num_unexposed = self._grid_size ** 2
+        self._num_flags = 0
+        self._num_correct_flags = 0
+
+    def _locate(self, index):
+        """Returns the chunk holding a cell and the cell's position in it."""
+        row, col = divmod(index, self._grid_size)
+        return ((row // CHUNK_SIZE, col // CHUNK_SIZE),
+                row % CHUNK_SIZE * CHUNK_SIZE + col % CHUNK_SIZE)
+
+    def __len__(self):
+        return self._grid_size ** 2
+
+    def __getitem__(self, index):
+        if not 0 <= index < self._grid_size ** 2:
+            raise IndexError("board index out of range")
+        chunk, local = self._locate(index)
+        cells = self._chunks.get(chunk)
+        if cells is None:
+            return UNEXPOSED
+        return _CELL_CHARACTER[cells[local]]
+
+    def __setitem__(self, index, character):
+        if not 0 <= index < self._grid_size ** 2:
+            raise IndexError("board index out of range")
+        code = _CELL_CODE[character]
+        chunk, local = self._locate(index)
+        cells = self._chunks.get(chunk)
+        if cells is None:
+            cells = self._chunks[chunk] = bytearray([_UNEXPOSED_CODE]) * CHUNK_SIZE ** 2
+        old = cells[local]
+        if old == code:
+            return
+        cells[local] = code
+        if old == _UNEXPOSED_CODE:
+            self._num_unexposed -= 1
+        elif old == _FLAG_CODE:
+            self._flag_changed(index, -1)
+        if code == _UNEXPOSED_CODE:
+            self._num_unexposed += 1
+        elif code == _FLAG_CODE:
+            self._flag_changed(index, 1)
+
+    def _flag_changed(self, index, change):
+        """Update the flag counts after a flag is placed or removed."""
+        self._num_flags += change
+        if index in self._pokemon_locations:
+            self._num_correct_flags += change
+
+    def __iter__(self):
+        return (self[index] for index in range(len(self)))
+
+    def __contains__(self, character):
+        return self.count(character) > 0
+
+    def count(self, character):
+        """Returns the number of cells holding the given character.
+
+        Parameters:
+            character (str): The cell character to count.
+        """
+        code = _CELL_CODE.get(character)
+        if code == _UNEXPOSED_CODE:
+            return self._num_unexposed
+        if code == _FLAG_CODE:
+            return self._num_flags
+        if code is None:
+            return 0
+        return sum(cells.count(code) for cells in self._chunks.values())
+
+    def __eq__(self, other):
+        if isinstance(other, (str, GameBoard, ChunkedBoard)):
+            return len(self) == len(other) and str(self) == str(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __str__(self):
+        return "".join(self)
+
+    def __repr__(self):
+        return (f"ChunkedBoard({self._grid_size}, seed={self._seed!r}, "
+                f"chunks={len(self._chunks)})")
@@ -0,0 +1,253 @@
+import argparse
+import random
+
+from a1_support import *
+from a1 import (check_win, flag_cell, parse_position, play, position_to_index,
+                replace_character_at_index, reveal_cells)
+from a1_board import GameBoard
+
+MAGIC = b"A1LG"
+VERSION = 1
+
+REVEAL_CODE = 0
+FLAG_CODE = 1
+RESTART_CODE = 2
+QUIT_CODE = 3
+
+WIN = "win"
+LOSE = "lose"
+QUIT = "quit"
+
+
+class SessionRecorder:
+    """Records the actions of a game session into a compact binary log.
+
+    The log starts with MAGIC, a version byte, then the seed, grid size and
+    number of pokemons as varints. Each action follows as one varint holding
+    the cell index shifted left two bits with the opcode in the low bits, so
+    most actions on boards up to 32x32 take two bytes or less.
+
+    The seed seeds the generator the pokemons are drawn from, including on
+    restart, so a session played by main after random.seed(seed) replays
+    exactly.
+    """
+
+    def __init__(self, seed, grid_size, number_of_pokemons):
+        """
+        Parameters:
+            seed (int): The seed the session was played with.
+            grid_size (int): The grid size of the game.
+            number_of_pokemons (int): The number of pokemons.
+        """
+        self._data = bytearray(MAGIC)
+        self._data.append(VERSION)
+        # zigzag so negative seeds stay short
+        write_varint(self._data, seed << 1 if seed >= 0 else (-seed << 1) - 1)
+        write_varint(self._data, grid_size)
+        write_varint(self._data, number_of_pokemons)
+        self._grid_size = grid_size
+
+    def reveal(self, index):
+        """Record revealing the cell at index."""
+        write_varint(self._data, index << 2 | REVEAL_CODE)
+
+    def flag(self, index):
+        """Record flagging or unflagging the cell at index."""
+        write_varint(self._data, index << 2 | FLAG_CODE)
+
+    def restart(self):
+        """Record restarting with new pokemons."""
+        write_varint(self._data, RESTART_CODE)
+
+    def quit(self):
+        """Record the player quitting."""
+        write_varint(self._data, QUIT_CODE)
+
+    def record_action(self, action, response=None):
+        """Record one line typed at the action prompt of main.
+
+        Help, invalid actions and a quit that is not confirmed change nothing
+        and are not recorded.
+
+        Parameters:
+            action (str): The action typed.
+            response (str): The answer to the quit prompt, if action is 'q'.
+        """
+        if action == "q":
+            if response == "y":
+                self.quit()
+        elif action == ":)":
+            self.restart()
+        elif action.startswith("f "):
+            position = parse_position(action[2:], self._grid_size)
+            if position is not None:
+                self.flag(position_to_index(position, self._grid_size))
+        elif action != "h":
+            position = parse_position(action, self._grid_size)
+            if position is not None:
+                self.reveal(position_to_index(position, self._grid_size))
+
+    def get_bytes(self):
+        """Returns the log so far."""
+        return bytes(self._data)
+
+    def save(self, path):
+        """Write the log so far to a file.
+
+        Parameters:
+            path (str): The file to write.
+        """
+        with open(path, "wb") as file:
+            file.write(self._data)
+
+
+def record_transcript(lines, seed):
+    """Record the input lines of a text transcript like those in test_data.
+
+    Parameters:
+        lines (list<str>): The grid size, the number of pokemons, then one
+            line per prompt.
+        seed (int): The seed main was run with.
+
+    Returns:
+        (SessionRecorder): The recorded session.
+    """
+    recorder = SessionRecorder(seed, int(lines[0]), int(lines[1]))
+    lines = iter(lines[2:])
+    for action in lines:
+        recorder.record_action(action, next(lines, None) if action == "q" else None)
+    return recorder
+
+
+def read_session(data):
+    """Unpack a session log.
+
+    Parameters:
+        data (bytes): The log, as written by SessionRecorder.
+
+    Returns:
+        (tuple<int, int, int, list<tuple<int, int>>>): The seed, grid size,
+        number of pokemons and the opcode and cell index of each action.
+
+    Raises:
+        ValueError: If data is not a session log this version can read, or
+            an action is damaged or outside the grid.
+    """
+    if data[:len(MAGIC)] != MAGIC or len(data) <= len(MAGIC) or data[len(MAGIC)] != VERSION:
+        raise ValueError("not a version %d session log" % VERSION)
+    position = len(MAGIC) + 1
+    try:
+        zigzag, position = read_varint(data, position)
+        grid_size, position = read_varint(data, position)
+        number_of_pokemons, position = read_varint(data, position)
+
+        cell_count = grid_size ** 2
+        actions = []
+        while position < len(data):
+            value, position = read_varint(data, position)
+            code, index = value & 3, value >> 2
+            if code in (REVEAL_CODE, FLAG_CODE) and index >= cell_count:
+                raise ValueError("an action is outside the grid")
+            if code in (RESTART_CODE, QUIT_CODE) and index:
+                raise ValueError("a restart or quit has a cell index")
+            actions.append((code, index))
+    except IndexError:
+        raise ValueError("the session log is cut short") from None
+    return zigzag >> 1 ^ -(zigzag & 1), grid_size, number_of_pokemons, actions
+
+
+def replay(data):
+    """Play a session log straight through the engine, without prompts or printing.
+
+    Parameters:
+        data (bytes): The log, as written by SessionRecorder.
+
+    Returns:
+        (tuple<str, GameBoard, int>): WIN, LOSE, QUIT or None if the log ends
+        mid game, the board when it ended and the number of actions applied.
+
+    Raises:
+        ValueError: If data is not a session log read_session can read.
+    """
+    seed, grid_size, number_of_pokemons, actions = read_session(data)
+    rng = random.Random(seed)
+    pokemon_locations = generate_pokemons(grid_size, number_of_pokemons, rng)
+    game = GameBoard(grid_size, pokemon_locations=pokemon_locations, index_regions=True)
+
+    applied = 0
+    for code, index in actions:
+        if check_win(game, pokemon_locations):
+            return WIN, game, applied
+        applied += 1
+        if code == REVEAL_CODE:
+            if game[index] == FLAG:
+                continue
+            if index in pokemon_locations:
+                for location in pokemon_locations:
+                    replace_character_at_index(game, location, POKEMON)
+                return LOSE, game, applied
+            reveal_cells(game, grid_size, pokemon_locations, index)
+        elif code == FLAG_CODE:
+            flag_cell(game, index)
+        elif code == RESTART_CODE:
+            pokemon_locations = generate_pokemons(grid_size, number_of_pokemons, rng)
+            game = GameBoard(grid_size, pokemon_locations=pokemon_locations,
+                             index_regions=True)
+        else:
+            return QUIT, game, applied
+    return (WIN if check_win(game, pokemon_locations) else None), game, applied
+
+
+def play_recorded(path, seed):
+    """Play a game at the prompts of main, recording it to a session log.
+
+    The log is written when the game ends, even if it ends with an error.
+
+    Parameters:
+        path (str): The file to write the log to.
+        seed (int): The seed for the pokemons.
+    """
+    recorders = []
+
+    def make_recorder(grid_size, number_of_pokemons):
+        recorders.append(SessionRecorder(seed, grid_size, number_of_pokemons))
+        return recorders[0]
+
+    try:
+        play(rng=seed, make_recorder=make_recorder)
+    finally:
+        if recorders:
+            recorders[0].save(path)
+
+
+def main():
+    """Convert a text transcript to a session log, replay a log, or record
+    a game as it is played."""
+    parser = argparse.ArgumentParser(description="Record and replay a1 sessions.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record = commands.add_parser("record", help="convert a text transcript")
+    record.add_argument("transcript")
+    record.add_argument("log")
+    record.add_argument("--seed", type=int, default=1001)
+    replay_command = commands.add_parser("replay", help="replay session logs")
+    replay_command.add_argument("logs", nargs="+")
+    play_command = commands.add_parser("play", help="play a game, recording it to a log")
+    play_command.add_argument("log")
+    play_command.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.command == "play":
+        play_recorded(args.log, random.getrandbits(32) if args.seed is None else args.seed)
+        return
+    if args.command == "record":
+        with open(args.transcript) as file:
+            record_transcript(file.read().splitlines(), args.seed).save(args.log)
+        return
+    for path in args.logs:
+        with open(path, "rb") as file:
+            outcome, game, applied = replay(file.read())
+        print(f"{path}: {outcome or 'unfinished'} after {applied} actions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+import argparse
+import os
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from a1_support import *
+from a1 import reveal_cells, reveal_many
+from a1_board import GameBoard, neighbour_table, neighbours_of
+from a1_solver import solve
+
+
+def centre_cell(grid_size):
+    """Returns the index of the cell in the middle of the grid."""
+    return grid_size // 2 * grid_size + grid_size // 2
+
+
+def _open(grid_size, pokemons, first_click):
+    """Returns a board with the pokemons placed and the first click revealed."""
+    pokemon_locations = PokemonLocations(pokemons, grid_size ** 2)
+    game = GameBoard(grid_size, pokemon_locations=pokemon_locations)
+    reveal_cells(game, grid_size, pokemon_locations, first_click)
+    return game
+
+
+def _play_safe(game, grid_size, number_of_pokemons):
+    """Reveal whatever the solver proves safe until it is stuck or done.
+
+    Returns:
+        (bool): True if every cell without a pokemon was revealed.
+    """
+    pokemon_locations = game.get_pokemon_locations()
+    while game.get_num_unexposed() > number_of_pokemons:
+        safe = [index for index in solve(game, grid_size, number_of_pokemons)[0]
+                if game[index] == UNEXPOSED]
+        if not safe:
+            return False
+        reveal_many(game, grid_size, pokemon_locations, safe)
+    return True
+
+
+def _move_pokemon(game, grid_size, pokemons, rng):
+    """Move a pokemon the player is stuck against into the unseen part of the board.
+
+    A pokemon next to a revealed cell moves to a cell that has no revealed
+    neighbour, so only the numbers around its old cell change. Those are
+    updated in place, and any that drop to 0 are opened up, leaving the
+    rest of the revealed board as it was.
+
+    Parameters:
+        game (GameBoard): The board the solver got stuck on.
+        grid_size (int): The grid size of the game.
+        pokemons (list<int>): The pokemon locations, changed in place.
+        rng (random.Random): The generator to choose the move with.
+
+    Returns:
+        (bool): False if there was no pokemon or no cell to move it to.
+    """
+    offsets, neighbours = neighbour_table(grid_size)
+
+    def seen(index):
+        return any(game[neighbour] != UNEXPOSED
+                   for neighbour in neighbours[offsets[index]:offsets[index + 1]])
+
+    taken = set(pokemons)
+    frontier = [k for k, location in enumerate(pokemons) if seen(location)]
+    interior = [index for index in range(grid_size ** 2)
+                if game[index] == UNEXPOSED and index not in taken and not seen(index)]
+    if not frontier or not interior:
+        return False
+
+    k = rng.choice(frontier)
+    source = pokemons[k]
+    pokemons[k] = rng.choice(interior)
+    pokemon_locations = PokemonLocations(pokemons, grid_size ** 2)
+    game.set_pokemon_locations(pokemon_locations)
+
+    adjacency = game.get_adjacency()
+    around = neighbours_of(source, grid_size)
+    for neighbour in around:
+        if game[neighbour] != UNEXPOSED:
+            game[neighbour] = str(adjacency[neighbour])
+    for neighbour in around:
+        if game[neighbour] == EXPOSED:
+            reveal_cells(game, grid_size, pokemon_locations, neighbour)
+    return True
+
+
+def generate_no_guess(grid_size, number_of_pokemons, first_click=None, rng=None,
+                      max_moves=None, max_restarts=20):
+    """Place pokemons so the game can be won from first_click without guessing.
+
+    The first click and its neighbours are kept clear so it opens a region.
+    When the solver gets stuck, a pokemon it is stuck against is moved and
+    solving carries on from the same revealed board rather than starting over.
+    Once that succeeds the board is checked again from the first click, since
+    a move can undo an earlier deduction, and only then returned.
+
+    Parameters:
+        grid_size (int): The grid size of the game.
+        number_of_pokemons (int): The number of pokemons.
+        first_click (int): The index the player opens first, the centre if not given.
+        rng (int | random.Random): The seed or generator to draw from, the
+            shared module level generator if not given.
+        max_moves (int): Moves to try before placing every pokemon again.
+        max_restarts (int): Times to place every pokemon before giving up.
+
+    Returns:
+        (PokemonLocations): The pokemon locations, or None if no board was found.
+    """
+    rng = make_rng(rng)
+    if first_click is None:
+        first_click = centre_cell(grid_size)
+    opening = {first_click, *neighbours_of(first_click, grid_size)}
+    allowed = [index for index in range(grid_size ** 2) if index not in opening]
+    if number_of_pokemons > len(allowed):
+        return None
+    if max_moves is None:
+        max_moves = 4 * number_of_pokemons + 20
+
+    for _ in range(max_restarts):
+        pokemons = rng.sample(allowed, number_of_pokemons)
+        game = _open(grid_size, pokemons, first_click)
+        verified = True
+        moves = 0
+        while True:
+            if _play_safe(game, grid_size, number_of_pokemons):
+                if verified:
+                    return game.get_pokemon_locations()
+                game = _open(grid_size, pokemons, first_click)
+                verified = True
+                continue
+            if moves == max_moves or not _move_pokemon(game, grid_size, pokemons, rng):
+                break
+            moves += 1
+            verified = False
+    return None
+
+
+class BoardCache:
+    """Generated boards stored on disk, one small file per board.
+
+    A board is stored as the packed indexes of its pokemons and keyed by
+    grid size, number of pokemons, seed and first click. Files are written to
+    a temporary name and renamed, so a reader never sees half a board.
+    """
+
+    def __init__(self, directory):
+        """
+        Parameters:
+            directory (str): Where to keep the boards, created if missing.
+        """
+        self._directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, grid_size, number_of_pokemons, seed, first_click):
+        return os.path.join(self._directory,
+                            f"{grid_size}-{number_of_pokemons}-{seed}-{first_click}.bin")
+
+    def get(self, grid_size, number_of_pokemons, seed, first_click):
+        """Returns the cached pokemon locations, or None if not cached.
+
+        A damaged file counts as not cached, so the board is generated again.
+        """
+        try:
+            with open(self._path(grid_size, number_of_pokemons, seed, first_click), "rb") as file:
+                data = file.read()
+        except FileNotFoundError:
+            return None
+        locations = array("i")
+        if len(data) != number_of_pokemons * locations.itemsize:
+            return None
+        locations.frombytes(data)
+        if number_of_pokemons and not 0 <= min(locations) <= max(locations) < grid_size ** 2:
+            return None
+        return PokemonLocations(locations, grid_size ** 2)
+
+    def put(self, grid_size, number_of_pokemons, seed, first_click, pokemon_locations):
+        """Store the pokemon locations of a generated board."""
+        path = self._path(grid_size, number_of_pokemons, seed, first_click)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(array("i", pokemon_locations).tobytes())
+        os.replace(temporary, path)
+
+
+def _generate_seeded(grid_size, number_of_pokemons, first_click, seed):
+    """generate_no_guess with a seed, for the worker pool."""
+    return generate_no_guess(grid_size, number_of_pokemons, first_click, seed)
+
+
+def generate_boards(grid_size, number_of_pokemons, seeds, first_click=None,
+                    workers=None, cache=None):
+    """Generate a no-guess board for each seed on a pool of worker processes.
+
+    Boards already in the cache are read from it, and only the rest are
+    generated and then added to it.
+
+    Parameters:
+        grid_size (int): The grid size of the game.
+        number_of_pokemons (int): The number of pokemons.
+        seeds (list<int>): The seed of each board.
+        first_click (int): The index the player opens first, the centre if not given.
+        workers (int): The number of worker processes, 0 to generate in this
+            process, or None to use one per CPU.
+        cache (BoardCache): Where to look for and store boards, if anywhere.
+
+    Returns:
+        (list<PokemonLocations>): The board for each seed, None where no
+        board was found.
+    """
+    if first_click is None:
+        first_click = centre_cell(grid_size)
+    boards = [None] * len(seeds)
+    missing = []
+    for k, seed in enumerate(seeds):
+        if cache is not None:
+            boards[k] = cache.get(grid_size, number_of_pokemons, seed, first_click)
+        if boards[k] is None:
+            missing.append(k)
+    if not missing:
+        return boards
+
+    arguments = ([grid_size] * len(missing), [number_of_pokemons] * len(missing),
+                 [first_click] * len(missing), [seeds[k] for k in missing])
+    if workers == 0:
+        generated = list(map(_generate_seeded, *arguments))
+    else:
+        with ProcessPoolExecutor(workers, initializer=neighbour_table,
+                                 initargs=(grid_size,)) as pool:
+            generated = list(pool.map(_generate_seeded, *arguments,
+                                      chunksize=max(1, len(missing) // 64)))
+
+    for k, pokemon_locations in zip(missing, generated):
+        boards[k] = pokemon_locations
+        if cache is not None and pokemon_locations is not None:
+            cache.put(grid_size, number_of_pokemons, seeds[k], first_click, pokemon_locations)
+    return boards
+
+
+def main():
+    """Generate no-guess boards from the command line and report the rate."""
+    parser = argparse.ArgumentParser(description="Generate a1 boards that need no guessing.")
+    parser.add_argument("boards", type=int)
+    parser.add_argument("grid_size", type=int)
+    parser.add_argument("number_of_pokemons", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cache", help="directory to cache boards in")
+    args = parser.parse_args()
+
+    cache = BoardCache(args.cache) if args.cache else None
+    start = time.perf_counter()
+    boards = generate_boards(args.grid_size, args.number_of_pokemons,
+                             child_seeds(args.seed, args.boards),
+                             workers=args.workers, cache=cache)
+    seconds = time.perf_counter() - start
+    found = sum(board is not None for board in boards)
+    print(f"{found}/{len(boards)} boards in {seconds:.2f}s "
+          f"({len(boards) / seconds:.0f} boards/s)")
+
+
+if __name__ == "__main__":
+    main()
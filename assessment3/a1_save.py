@@ -0,0 +1,173 @@
+import os
+import re
+
+from a1_support import *
+
+MAGIC = b"A1SV"
+VERSION = 1
+
+HAS_SEED = 1
+PLACED = 2
+
+# The cells a board can hold, numbered by their place here in the run codes.
+SYMBOLS = UNEXPOSED + FLAG + POKEMON + "012345678"
+_SYMBOL_CODE = {symbol: code for code, symbol in enumerate(SYMBOLS)}
+_RUN = re.compile(r"(.)\1*", re.S)
+_SET_BYTE = re.compile(rb"[^\x00]")
+_BITS = [tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)]
+
+
+def pack_game(game, grid_size, number_of_pokemons, pokemon_locations=None, seed=None):
+    """Pack a game into the save format.
+
+    The save starts with MAGIC, a version byte and a byte of HAS_SEED and
+    PLACED bits, then as varints the grid size, number of pokemons, flags,
+    unexposed cells and, if there is one, the seed. The pokemons follow as a
+    bitset of one bit per cell when they have been placed, then the board as
+    runs of equal cells, each one varint holding the run length shifted left
+    four bits with the cell's place in SYMBOLS in the low bits.
+
+    Parameters:
+        game (str | GameBoard): The game string or board.
+        grid_size (int): The grid size of the game.
+        number_of_pokemons (int): The number of pokemons.
+        pokemon_locations (tuple<int, ...>): Where the pokemons are hidden,
+            None or empty if they are still to be placed.
+        seed (int): The seed the pokemons were drawn with, if known.
+
+    Returns:
+        (bytes): The packed game.
+    """
+    cells = str(game)
+    cell_count = grid_size ** 2
+    if len(cells) != cell_count:
+        raise ValueError("the game string does not fit the grid size")
+    flags = (HAS_SEED if seed is not None else 0) | (PLACED if pokemon_locations else 0)
+
+    data = bytearray(MAGIC)
+    data.append(VERSION)
+    data.append(flags)
+    write_varint(data, grid_size)
+    write_varint(data, number_of_pokemons)
+    write_varint(data, cells.count(FLAG))
+    write_varint(data, cells.count(UNEXPOSED))
+    if seed is not None:
+        # zigzag so negative seeds stay short
+        write_varint(data, seed << 1 if seed >= 0 else (-seed << 1) - 1)
+    if pokemon_locations:
+        mask = bytearray((cell_count + 7) // 8)
+        for location in pokemon_locations:
+            mask[location >> 3] |= 1 << (location & 7)
+        data += mask
+    for run in _RUN.finditer(cells):
+        write_varint(data, (run.end() - run.start()) << 4 | _SYMBOL_CODE[run.group(1)])
+    return bytes(data)
+
+
+def unpack_game(data):
+    """Unpack a game written by pack_game, in time proportional to the data.
+
+    Parameters:
+        data (bytes): The packed game.
+
+    Returns:
+        (tuple<int, int, str, PokemonLocations, int>): The grid size, number
+        of pokemons, game string, pokemon locations and seed. The locations
+        are None if the pokemons were still to be placed and the seed is None
+        if it was not saved. There can be fewer locations than the number of
+        pokemons when placement ran out of room for them all.
+
+    Raises:
+        ValueError: If data is not a save this version can read, or is damaged.
+    """
+    if data[:len(MAGIC)] != MAGIC or len(data) <= len(MAGIC) + 1 or data[len(MAGIC)] != VERSION:
+        raise ValueError("not a version %d save" % VERSION)
+    try:
+        flags = data[len(MAGIC) + 1]
+        position = len(MAGIC) + 2
+        grid_size, position = read_varint(data, position)
+        number_of_pokemons, position = read_varint(data, position)
+        num_flags, position = read_varint(data, position)
+        num_unexposed, position = read_varint(data, position)
+        seed = None
+        if flags & HAS_SEED:
+            zigzag, position = read_varint(data, position)
+            seed = zigzag >> 1 ^ -(zigzag & 1)
+
+        cell_count = grid_size ** 2
+        pokemon_locations = None
+        if flags & PLACED:
+            end = position + (cell_count + 7) // 8
+            mask = bytearray(data[position:end])
+            if len(mask) < end - position:
+                raise ValueError("the save ends inside the pokemons")
+            position = end
+            # only the bytes holding a pokemon are looked at bit by bit
+            locations = [match.start() << 3 | bit for match in _SET_BYTE.finditer(mask)
+                         for bit in _BITS[mask[match.start()]]]
+            pokemon_locations = PokemonLocations.from_mask(locations, mask)
+
+        runs = []
+        total = 0
+        while position < len(data):
+            run, position = read_varint(data, position)
+            # checked before the run is built, so a damaged length cannot
+            # ask for more memory than the board holds
+            total += run >> 4
+            if total > cell_count:
+                raise ValueError("the board does not fit the grid size")
+            runs.append(SYMBOLS[run & 15] * (run >> 4))
+    except IndexError:
+        raise ValueError("the save is cut short") from None
+    game = "".join(runs)
+
+    if len(game) != cell_count:
+        raise ValueError("the board does not fit the grid size")
+    if game.count(FLAG) != num_flags or game.count(UNEXPOSED) != num_unexposed:
+        raise ValueError("the board does not match its counts")
+    # placement places fewer pokemons than asked for when they do not fit
+    if pokemon_locations is not None and (len(pokemon_locations) > number_of_pokemons
+                                          or locations and locations[-1] >= cell_count):
+        raise ValueError("the pokemons do not match their count")
+    return grid_size, number_of_pokemons, game, pokemon_locations, seed
+
+
+def write_save(path, game, grid_size, number_of_pokemons, pokemon_locations=None,
+               seed=None):
+    """Pack a game and write it to a file.
+
+    The save is written to a temporary file beside path and renamed over it,
+    so a crash part way through leaves the previous save in place.
+
+    Parameters:
+        path (str): The file to write.
+        See pack_game for the rest.
+    """
+    data = pack_game(game, grid_size, number_of_pokemons, pokemon_locations, seed)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+
+def read_save(path):
+    """Read a game written by write_save.
+
+    Parameters:
+        path (str): The file to read.
+
+    Returns:
+        See unpack_game.
+
+    Raises:
+        ValueError: If the file is not a save this version can read.
+    """
+    with open(path, "rb") as file:
+        return unpack_game(file.read())
@@ -0,0 +1,224 @@
+import argparse
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from a1_support import *
+from a1 import check_win, flag_cell, reveal_cells
+from a1_board import GameBoard, neighbour_table
+from a1_noguess import centre_cell, generate_no_guess
+from a1_solver import solve
+
+REVEAL = "reveal"
+FLAG_ACTION = "flag"
+
+
+def random_policy(game, grid_size, rng):
+    """Reveal a random unexposed cell, or flag one once they must all be pokemons.
+
+    A policy is called with the board and a generator and returns the moves
+    to make next, which are played in order. It may read the cells and counts of the board
+    and how many pokemons it holds, but not where they are.
+
+    Parameters:
+        game (GameBoard): The board as the player sees it.
+        grid_size (int): The grid size of the game.
+        rng (random.Random): The generator for the game.
+
+    Returns:
+        (list<tuple<str, int>>): REVEAL or FLAG_ACTION and the index of the
+        cell, empty if no cell is left unexposed.
+    """
+    unexposed = game.get_num_unexposed()
+    if unexposed == 0:
+        return []
+    hidden = len(game.get_pokemon_locations()) - game.get_num_flags()
+    action = FLAG_ACTION if unexposed == hidden else REVEAL
+
+    if 4 * unexposed >= grid_size ** 2:
+        while True:
+            index = rng.randrange(grid_size ** 2)
+            if game[index] == UNEXPOSED:
+                return [(action, index)]
+    cells = str(game)
+    return [(action, rng.choice([index for index, cell in enumerate(cells)
+                                 if cell == UNEXPOSED]))]
+
+
+def solver_policy(game, grid_size, rng):
+    """Reveal every cell the solver proves safe and flag every cell it proves
+    a pokemon, and guess like random_policy only when it can prove nothing.
+
+    Playing everything one solve proves before solving again keeps the
+    solver to a call per step of reasoning rather than one per move.
+
+    Parameters:
+        game (GameBoard): The board as the player sees it.
+        grid_size (int): The grid size of the game.
+        rng (random.Random): The generator for the game.
+
+    Returns:
+        (list<tuple<str, int>>): REVEAL or FLAG_ACTION and the index of the cell.
+    """
+    safe, pokemons = solve(game, grid_size, len(game.get_pokemon_locations()))
+    moves = ([(REVEAL, index) for index in sorted(safe) if game[index] == UNEXPOSED]
+             + [(FLAG_ACTION, index) for index in sorted(pokemons) if game[index] == UNEXPOSED])
+    return moves or random_policy(game, grid_size, rng)
+
+
+def play_game(grid_size, number_of_pokemons, policy, seed, max_moves=None,
+              no_guess=False):
+    """Play one game without any prompts or printing.
+
+    A no_guess game is placed by generate_no_guess and starts with its centre
+    cell revealed, which counts as the first move.
+
+    Parameters:
+        grid_size (int): The grid size of the game.
+        number_of_pokemons (int): The number of pokemons.
+        policy (callable): Chooses the moves, see random_policy.
+        seed (int): The seed for the pokemons and the policy.
+        max_moves (int): Give up after this many moves, 2 * cells if not given.
+            The game also stops when the policy gives no move that can be played.
+        no_guess (bool): Whether to play a board that needs no guessing.
+
+    Returns:
+        (tuple<bool, int>): Whether the game was won and the moves taken.
+    """
+    rng = random.Random(seed)
+    pokemon_locations = None
+    if no_guess:
+        pokemon_locations = generate_no_guess(grid_size, number_of_pokemons, rng=rng)
+    if pokemon_locations is None:
+        no_guess = False
+        pokemon_locations = generate_pokemons(grid_size, number_of_pokemons, rng)
+    game = GameBoard(grid_size, pokemon_locations=pokemon_locations, index_regions=True)
+    if max_moves is None:
+        max_moves = 2 * grid_size ** 2
+
+    moves = 0
+    if no_guess:
+        reveal_cells(game, grid_size, pokemon_locations, centre_cell(grid_size))
+        moves += 1
+    while moves < max_moves:
+        played = moves
+        for action, index in policy(game, grid_size, rng):
+            # an earlier move may already have revealed the cell
+            if game[index] != UNEXPOSED:
+                continue
+            moves += 1
+            if action == FLAG_ACTION:
+                flag_cell(game, index)
+            elif index in pokemon_locations:
+                return False, moves
+            else:
+                reveal_cells(game, grid_size, pokemon_locations, index)
+            if check_win(game, pokemon_locations):
+                return True, moves
+            if moves >= max_moves:
+                break
+        if moves == played:
+            break
+    return False, moves
+
+
+def play_batch(grid_size, number_of_pokemons, policy, seeds, no_guess=False):
+    """Play a game for each seed and add up the results.
+
+    Parameters:
+        grid_size (int): The grid size of the game.
+        number_of_pokemons (int): The number of pokemons.
+        policy (callable): Chooses the moves, see random_policy.
+        seeds (list<int>): The seed of each game.
+        no_guess (bool): Whether to play boards that need no guessing.
+
+    Returns:
+        (tuple<int, int, int>): The games played, games won and total moves.
+    """
+    wins = moves = 0
+    for seed in seeds:
+        won, taken = play_game(grid_size, number_of_pokemons, policy, seed,
+                               no_guess=no_guess)
+        wins += won
+        moves += taken
+    return len(seeds), wins, moves
+
+
+def simulate(games, grid_size, number_of_pokemons, policy=random_policy, seed=0,
+             workers=None, batch_size=256, no_guess=False):
+    """Play many games, spread across a pool of worker processes.
+
+    Every game gets a seed derived from seed and its number, so the results do
+    not depend on how the games are split between workers. Each worker builds
+    the neighbour table once when it starts and shares it between its games.
+
+    Parameters:
+        games (int): The number of games to play.
+        grid_size (int): The grid size of the game.
+        number_of_pokemons (int): The number of pokemons.
+        policy (callable): Chooses the moves, must be a module level function
+            so it can be sent to the workers.
+        seed (int): The seed for the whole run.
+        workers (int): The number of worker processes, 0 to play in this
+            process, or None to use one per CPU.
+        batch_size (int): The number of games sent to a worker at a time.
+        no_guess (bool): Whether to play boards that need no guessing.
+
+    Returns:
+        (dict<str, float>): The games played and won, the win rate, the moves
+        per game and the games played per second.
+    """
+    seeds = child_seeds(seed, games)
+    batches = [seeds[start:start + batch_size] for start in range(0, games, batch_size)]
+
+    start = time.perf_counter()
+    if workers == 0:
+        neighbour_table(grid_size)
+        results = [play_batch(grid_size, number_of_pokemons, policy, batch, no_guess)
+                   for batch in batches]
+    else:
+        with ProcessPoolExecutor(workers, initializer=neighbour_table,
+                                 initargs=(grid_size,)) as pool:
+            results = list(pool.map(play_batch, [grid_size] * len(batches),
+                                    [number_of_pokemons] * len(batches),
+                                    [policy] * len(batches), batches,
+                                    [no_guess] * len(batches)))
+    seconds = time.perf_counter() - start
+
+    played = sum(result[0] for result in results)
+    wins = sum(result[1] for result in results)
+    moves = sum(result[2] for result in results)
+    return {
+        "games": played,
+        "wins": wins,
+        "win_rate": wins / played if played else 0.0,
+        "moves_per_game": moves / played if played else 0.0,
+        "games_per_second": played / seconds if seconds else 0.0,
+    }
+
+
+POLICIES = {"random": random_policy, "solver": solver_policy}
+
+
+def main():
+    """Run a simulation from the command line and print the results."""
+    parser = argparse.ArgumentParser(description="Play many a1 games without a player.")
+    parser.add_argument("games", type=int)
+    parser.add_argument("grid_size", type=int)
+    parser.add_argument("number_of_pokemons", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="random")
+    parser.add_argument("--no-guess", action="store_true",
+                        help="play boards that can be won without guessing")
+    args = parser.parse_args()
+
+    results = simulate(args.games, args.grid_size, args.number_of_pokemons,
+                       policy=POLICIES[args.policy], seed=args.seed,
+                       workers=args.workers, no_guess=args.no_guess)
+    for name, value in results.items():
+        print(f"{name}: {value:.4g}" if isinstance(value, float) else f"{name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
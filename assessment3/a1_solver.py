@@ -0,0 +1,264 @@
+from functools import lru_cache
+
+from a1_support import *
+from a1_board import neighbour_table
+
+DIGITS = "012345678"
+
+
+@lru_cache(maxsize=4)
+def _neighbour_lists(grid_size):
+    """The neighbours of every cell as tuples, which are cheaper to intersect
+    with a set than slices of the neighbour table.
+    """
+    offsets, neighbours = neighbour_table(grid_size)
+    return tuple(tuple(neighbours[offsets[index]:offsets[index + 1]])
+                 for index in range(grid_size ** 2))
+
+
+def _unknown_cells(cells):
+    """The indices of the unexposed and flagged cells of a game string."""
+    return {index for index, cell in enumerate(cells) if cell == UNEXPOSED or cell == FLAG}
+
+
+def frontier_constraints(game, grid_size, unknown=None):
+    """Read the constraints a game string puts on its unknown cells.
+
+    Every revealed number next to unknown cells says how many of those cells
+    hold a pokemon. Flagged cells are treated as unknown, since the player may
+    have flagged them wrongly.
+
+    Parameters:
+        game (str): Game string.
+        grid_size (int): The grid size of the game.
+        unknown (set<int>): The unknown cells, if already found.
+
+    Returns:
+        (dict<frozenset<int>, int>): The pokemons among each set of unknown cells.
+    """
+    cells = str(game)
+    if unknown is None:
+        unknown = _unknown_cells(cells)
+    neighbours = _neighbour_lists(grid_size)
+    constraints = {}
+    for index, cell in enumerate(cells):
+        if cell in DIGITS:
+            around = unknown.intersection(neighbours[index])
+            if around:
+                constraints[frozenset(around)] = int(cell)
+    return constraints
+
+
+def _reduce(constraints, safe, pokemons):
+    """Remove the cells already known from every constraint.
+
+    Parameters:
+        constraints (dict<frozenset<int>, int>): The constraints to reduce.
+        safe (set<int>): Cells known to be safe.
+        pokemons (set<int>): Cells known to hold a pokemon.
+
+    Returns:
+        (dict<frozenset<int>, int>): The constraints on the cells still unknown.
+    """
+    reduced = {}
+    for cells, count in constraints.items():
+        if not (cells.isdisjoint(safe) and cells.isdisjoint(pokemons)):
+            count -= len(cells & pokemons)
+            cells = cells - safe - pokemons
+        if cells:
+            reduced[cells] = count
+    return reduced
+
+
+def _single_cell(constraints, safe, pokemons):
+    """Settle constraints whose cells are all safe or all pokemons.
+
+    Returns:
+        (bool): True if any cell was settled.
+    """
+    progress = False
+    for cells, count in constraints.items():
+        if count == 0:
+            safe |= cells
+            progress = True
+        elif count == len(cells):
+            pokemons |= cells
+            progress = True
+    return progress
+
+
+def _pairwise(constraints, safe, pokemons):
+    """Compare each pair of overlapping constraints.
+
+    When one constraint contains another, the cells left over hold the
+    difference of their counts, which is added as a new constraint. When the
+    difference of the counts equals the cells only the first one covers, those
+    cells are all pokemons and the cells only the second one covers are safe.
+
+    Returns:
+        (bool): True if any cell was settled or any constraint added.
+    """
+    by_cell = {}
+    for cells in constraints:
+        for cell in cells:
+            by_cell.setdefault(cell, []).append(cells)
+
+    derived = {}
+    progress = False
+    seen = set()
+    for sharing in by_cell.values():
+        for first in sharing:
+            for second in sharing:
+                if first is second or (first, second) in seen:
+                    continue
+                seen.add((first, second))
+                difference = constraints[first] - constraints[second]
+                if second < first:
+                    rest = first - second
+                    if rest not in constraints and rest not in derived:
+                        derived[rest] = difference
+                    continue
+                only_first = first - second
+                if difference == len(only_first):
+                    pokemons |= only_first
+                    safe |= second - first
+                    progress = True
+    constraints.update(derived)
+    return progress or bool(derived)
+
+
+def _components(constraints):
+    """Split the constraints into groups that share no cells.
+
+    Returns:
+        (list<tuple<list<int>, list<tuple<frozenset<int>, int>>>>): The cells
+        and constraints of each group.
+    """
+    parent = {}
+
+    def find(cell):
+        while parent[cell] != cell:
+            parent[cell] = parent[parent[cell]]
+            cell = parent[cell]
+        return cell
+
+    for cells in constraints:
+        first = None
+        for cell in cells:
+            parent.setdefault(cell, cell)
+            if first is None:
+                first = find(cell)
+            else:
+                parent[find(cell)] = first
+
+    groups = {}
+    for cells, count in constraints.items():
+        root = find(next(iter(cells)))
+        groups.setdefault(root, ([], []))[1].append((cells, count))
+    for cell in parent:
+        groups[find(cell)][0].append(cell)
+    return list(groups.values())
+
+
+def _enumerate(cells, constraints):
+    """Try every placement of pokemons on a group of cells.
+
+    Parameters:
+        cells (list<int>): The unknown cells of the group.
+        constraints (list<tuple<frozenset<int>, int>>): The group's constraints.
+
+    Returns:
+        (tuple<int, dict<int, int>>): The number of placements that meet every
+        constraint and how many of them put a pokemon on each cell.
+    """
+    cells = sorted(cells)
+    position = {cell: k for k, cell in enumerate(cells)}
+    needed = [count for _, count in constraints]
+    # the cells of each constraint still to be decided
+    open_cells = [len(group) for group, _ in constraints]
+    touching = [[] for _ in cells]
+    for k, (group, _) in enumerate(constraints):
+        for cell in group:
+            touching[position[cell]].append(k)
+
+    solutions = 0
+    hits = [0] * len(cells)
+    chosen = [False] * len(cells)
+
+    def place(depth):
+        nonlocal solutions
+        if depth == len(cells):
+            solutions += 1
+            for k in range(len(cells)):
+                if chosen[k]:
+                    hits[k] += 1
+            return
+        for pokemon in (False, True):
+            ok = True
+            for k in touching[depth]:
+                open_cells[k] -= 1
+                needed[k] -= pokemon
+                if needed[k] < 0 or needed[k] > open_cells[k]:
+                    ok = False
+            if ok:
+                chosen[depth] = pokemon
+                place(depth + 1)
+            for k in touching[depth]:
+                open_cells[k] += 1
+                needed[k] += pokemon
+        chosen[depth] = False
+
+    place(0)
+    return solutions, {cell: hits[k] for k, cell in enumerate(cells)}
+
+
+def solve(game, grid_size, number_of_pokemons=None, max_component=16):
+    """Find the unknown cells that are certainly safe or certainly pokemons.
+
+    Cheap rules run first: a number whose cells are all safe or all pokemons,
+    then pairs of numbers that overlap. Only when those stop making progress
+    are small groups of cells enumerated.
+
+    Parameters:
+        game (str): Game string.
+        grid_size (int): The grid size of the game.
+        number_of_pokemons (int): The pokemons on the board, if known.
+        max_component (int): The most cells in a group that will be enumerated.
+
+    Returns:
+        (tuple<set<int>, set<int>>): The cells known to be safe and the cells
+        known to hold a pokemon. Flagged cells may appear in either.
+    """
+    unknown = _unknown_cells(str(game))
+    constraints = frontier_constraints(game, grid_size, unknown)
+    safe, pokemons = set(), set()
+
+    while True:
+        if _single_cell(constraints, safe, pokemons) or _pairwise(constraints, safe, pokemons):
+            constraints = _reduce(constraints, safe, pokemons)
+            continue
+        if number_of_pokemons is not None:
+            rest = unknown - safe - pokemons
+            left = number_of_pokemons - len(pokemons)
+            if rest and left in (0, len(rest)):
+                (pokemons if left else safe).update(rest)
+                constraints = _reduce(constraints, safe, pokemons)
+                continue
+        found = False
+        for cells, group in _components(constraints):
+            if len(cells) > max_component:
+                continue
+            solutions, hits = _enumerate(cells, group)
+            if not solutions:
+                continue
+            for cell, count in hits.items():
+                if count == 0:
+                    safe.add(cell)
+                    found = True
+                elif count == solutions:
+                    pokemons.add(cell)
+                    found = True
+        if not found:
+            break
+        constraints = _reduce(constraints, safe, pokemons)
+    return safe, pokemons
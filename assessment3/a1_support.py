@@ -1,4 +1,6 @@
+import hashlib
 import random
+from functools import lru_cache
 
 ALPHA = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
 UP = "up"
@@ -23,28 +25,214 @@ q - Quit.
 """
 
 
-def generate_pokemons(grid_size, number_of_pokemons):
+def row_label(row):
+    """Returns the spreadsheet style label of a row: A to Z, then AA, AB and so on.
+
+    Parameters:
+        row (int): The row number, counting from 0.
+
+    Returns:
+        (str): The row label.
+    """
+    label = ""
+    row += 1
+    while row:
+        row, letter = divmod(row - 1, len(ALPHA))
+        label = ALPHA[letter] + label
+    return label
+
+
+@lru_cache(maxsize=4)
+def row_labels(grid_size):
+    """Returns the labels of every row and a lookup from label to row.
+
+    Parameters:
+        grid_size (int): The grid size of the game.
+
+    Returns:
+        (tuple<tuple<str, ...>, dict<str, int>>): The labels in row order and
+        the row of each label.
+    """
+    labels = tuple(row_label(row) for row in range(grid_size))
+    return labels, {label: row for row, label in enumerate(labels)}
+
+
+class PokemonLocations(tuple):
+    """The indexes of the pokemons in a game, with a bitset for fast membership.
+
+    Iterates, compares and indexes exactly like a tuple of the indexes in the
+    order they were placed, while 'index in pokemon_locations' is a single bit
+    test instead of a scan.
+    """
+
+    def __new__(cls, locations=(), cell_count=None):
+        """
+        Parameters:
+            locations (iterable<int>): The indexes of the pokemons.
+            cell_count (int): The number of cells in the game.
+        """
+        self = super().__new__(cls, locations)
+        if cell_count is None:
+            cell_count = max(self, default=-1) + 1
+        mask = bytearray((cell_count + 7) // 8)
+        for location in self:
+            mask[location >> 3] |= 1 << (location & 7)
+        self._mask = mask
+        return self
+
+    @classmethod
+    def from_mask(cls, locations, mask):
+        """Wrap locations whose bitset has already been built.
+
+        Parameters:
+            locations (list<int>): The indexes of the pokemons.
+            mask (bytearray): The packed bitset of the same indexes.
+
+        Returns:
+            (PokemonLocations): The locations sharing the given mask.
+        """
+        self = tuple.__new__(cls, locations)
+        self._mask = mask
+        return self
+
+    def __contains__(self, index):
+        if not isinstance(index, int) or index < 0 or index >> 3 >= len(self._mask):
+            return False
+        return bool(self._mask[index >> 3] >> (index & 7) & 1)
+
+
+def make_rng(rng=None):
+    """Returns a random number generator to draw from.
+
+    Parameters:
+        rng (int | random.Random): A seed for a new generator, an existing
+            generator, or None or the random module to use the shared module
+            level generator.
+
+    Returns:
+        (random.Random): The generator, or the random module itself.
+    """
+    if rng is None or rng is random:
+        return random
+    if isinstance(rng, random.Random):
+        return rng
+    return random.Random(rng)
+
+
+def derive_seed(seed, *keys):
+    """Derive a seed from a parent seed and some keys by hashing them together.
+
+    Parameters:
+        seed (int | str): The parent seed.
+        *keys: Values naming the child, e.g. a board number or chunk coordinates.
+
+    Returns:
+        (int): The child seed.
+    """
+    name = "/".join(str(part) for part in (seed,) + keys)
+    return int.from_bytes(hashlib.sha256(name.encode()).digest()[:8], "big")
+
+
+def child_seeds(seed, count):
+    """Derive independent seeds for generating several boards from one seed.
+
+    Each child seed is a hash of the parent seed and the child's number, so
+    board i gets the same seed however the boards are split between workers.
+
+    Parameters:
+        seed (int | str): The parent seed.
+        count (int): The number of child seeds.
+
+    Returns:
+        (list<int>): The child seeds.
+    """
+    return [derive_seed(seed, i) for i in range(count)]
+
+
+def child_rngs(seed, count):
+    """Returns independent generators for generating several boards from one seed.
+
+    Parameters:
+        seed (int | str): The parent seed.
+        count (int): The number of generators.
+
+    Returns:
+        (list<random.Random>): The generators.
+    """
+    return [random.Random(child) for child in child_seeds(seed, count)]
+
+
+def generate_pokemons(grid_size, number_of_pokemons, rng=None):
     """Pokemons will be generated and given a random index within the game.
 
+    Up to half the board is filled by drawing cells until a free one comes up,
+    as it always has been. Denser boards use Floyd's sampling so every draw
+    places a pokemon, keeping the work proportional to the number of pokemons.
+
     Parameters:
         grid_size (int): The grid size of the game.
         number_of_pokemons (int): The number of pokemons that the game will have.
+        rng (int | random.Random): The seed or generator to draw from, the
+            shared module level generator if not given.
 
     Returns:
-        (tuple<int>): A tuple containing  indexes where the pokemons are
+        (PokemonLocations): A tuple containing  indexes where the pokemons are
         created for the game string.
     """
+    randrange = make_rng(rng).randrange
     cell_count = grid_size ** 2
-    pokemon_locations = ()
+    number_of_pokemons = max(0, min(number_of_pokemons, cell_count))
+    pokemon_locations = []
+    taken = bytearray((cell_count + 7) // 8)
+
+    if 2 * number_of_pokemons <= cell_count:
+        for _ in range(number_of_pokemons):
+            index = randrange(cell_count)
+
+            while taken[index >> 3] >> (index & 7) & 1:
+                index = randrange(cell_count)
+
+            taken[index >> 3] |= 1 << (index & 7)
+            pokemon_locations.append(index)
+    else:
+        for last in range(cell_count - number_of_pokemons, cell_count):
+            index = randrange(last + 1)
+            if taken[index >> 3] >> (index & 7) & 1:
+                index = last
+            taken[index >> 3] |= 1 << (index & 7)
+            pokemon_locations.append(index)
+
+    return PokemonLocations.from_mask(pokemon_locations, taken)
 
-    for _ in range(number_of_pokemons):
-        if len(pokemon_locations) >= cell_count:
-            break
-        index = random.randint(0, cell_count-1)
 
-        while index in pokemon_locations:
-            index = random.randint(0, cell_count-1)
+def write_varint(out, value):
+    """Append an unsigned integer to out, seven bits per byte, low bits first.
 
-        pokemon_locations += (index,)
+    Parameters:
+        out (bytearray): The buffer to append to.
+        value (int): The value, which must not be negative.
+    """
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, position):
+    """Read an unsigned integer written by write_varint.
 
-    return pokemon_locations
+    Parameters:
+        data (bytes): The buffer to read from.
+        position (int): Where the integer starts.
+
+    Returns:
+        (tuple<int, int>): The value and the position after it.
+    """
+    value = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
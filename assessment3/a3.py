@@ -5,6 +5,12 @@ import random
 import time
 import os
 import sys
+from contextlib import contextmanager
+
+from a1_board import GameBoard, neighbour_table
+from a1_autosave import Autosaver, read_latest
+from a1_save import read_save, write_save
+from a1_support import generate_pokemons
 
 ALPHA = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
 UP = "up"
@@ -29,21 +35,104 @@ q - Quit.
 """
 TASK_ONE = "TASK_ONE"
 TASK_TWO = "TASK_TWO"
+PLAYING = "playing"
+WON = "won"
+LOST = "lost"
+SAVE_FILE = "Saved_Game.a1s"
+AUTOSAVE_FILE = "Autosave.a1s"
 
 cell_size = 60
+POKEMON_SPRITES = ("togepi","charizard","cyndaquil","pikachu","psyduck","umbreon")
+ADJACENT_IMAGES = ("zero_adjacent","one_adjacent","two_adjacent","three_adjacent","four_adjacent",
+                   "five_adjacent","six_adjacent","seven_adjacent","eight_adjacent")
+class BoardEvent:
+    """A batch of changes to the board, sent by BoardModel to its subscribers."""
+    def __init__(self,changes,status,previous_status,reset=False):
+        """
+        Parameters:
+            changes(list<tuple<int, str, str>>): The index, old and new character of each changed cell.
+            status(str): PLAYING, WON or LOST after the changes.
+            previous_status(str): The status before the changes.
+            reset(bool): Whether the whole board was replaced, so changes is empty.
+        """
+        self._changes = changes
+        self._status = status
+        self._previous_status = previous_status
+        self._reset = reset
+    def get_changes(self):
+        """Returns the (index, old, new) of every cell that changed."""
+        return self._changes
+    def get_status(self):
+        """Returns the status of the game after the changes."""
+        return self._status
+    def get_previous_status(self):
+        """Returns the status of the game before the changes."""
+        return self._previous_status
+    def is_reset(self):
+        """Returns True if the whole board was replaced and should be redrawn."""
+        return self._reset
+
 class BoardModel:
-    """The BoardModel class is used to store and manage the internal game state."""
-    def __init__(self,grid_size,num_pokemon):
+    """The BoardModel class is used to store and manage the internal game state.
+    Subscribers are told of every change to the board with a BoardEvent. Changes
+    made inside batch() reach them as one event."""
+    def __init__(self,grid_size,num_pokemon,lazy=False):
         """
         Construct the basic model of the game..
         Parameters:
             grid_size(int): The cell number of raws and columns
             num_pokemon(int): The number of pokemons
+            lazy(bool): Whether to wait for the first reveal to place the pokemons
         """
         self._grid_size = grid_size
         self._number_pokemon =num_pokemon
-        self._game = '~'*grid_size**2
-        self._pokemon_locations = self.generate_pokemons(self._grid_size, self._number_pokemon)
+        self._lazy = lazy
+        self._listeners = []
+        self._changes = []
+        self._reset = False
+        self._batch_depth = 0
+        self._status = PLAYING
+        self._seed = None
+        self._num_shown_pokemons = 0
+        self.new_game()
+
+    def subscribe(self,listener):
+        """Call listener with a BoardEvent after every change to the board.
+        Parameter:
+            listener(callable): Takes the BoardEvent."""
+        self._listeners.append(listener)
+    def unsubscribe(self,listener):
+        """Stop calling a listener given to subscribe."""
+        self._listeners.remove(listener)
+    @contextmanager
+    def batch(self):
+        """Gather the changes made inside the with block into one event."""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._publish()
+    def _publish(self):
+        """Send the changes gathered so far to every subscriber."""
+        if not self._changes and not self._reset:
+            return
+        previous = self._status
+        if self._num_shown_pokemons:
+            self._status = LOST
+        elif self.check_win(self._game,self._pokemon_locations):
+            self._status = WON
+        else:
+            self._status = PLAYING
+        event = BoardEvent(self._changes,self._status,previous,self._reset)
+        self._changes = []
+        self._reset = False
+        for listener in list(self._listeners):
+            listener(event)
+    def get_status(self):
+        """Returns PLAYING, WON or LOST."""
+        return self._status
 
     def get_game(self):
         """Returns an appropriate representation of the current state of the game board."""
@@ -53,16 +142,59 @@ class BoardModel:
         return self._pokemon_locations
     def get_num_attempted_catches(self):
         """Returns the number of pokeballs currently placed on the board."""
-        return self._game.count(FLAG)
+        return self._game.get_num_flags()
     def get_num_pokemon(self):
         """Returns the number of pokemon hidden in the game."""
         return self._number_pokemon
+    def get_grid_size(self):
+        """Returns the grid size of the game."""
+        return self._grid_size
+    def get_seed(self):
+        """Returns the seed the pokemons are drawn with, None if unknown."""
+        return self._seed
+    def load(self,game,pokemon_locations,grid_size=None,num_pokemon=None,seed=None):
+        """Replace the board with a saved game.
+        Parameters:
+            game(str): The game string.
+            pokemon_locations(tuple<int, ...>): The indices of the pokemons, None if still to be placed.
+            grid_size(int): The grid size of the saved game, if it differs.
+            num_pokemon(int): The number of pokemons of the saved game, if it differs.
+            seed(int): The seed the pokemons were drawn with, if known."""
+        with self.batch():
+            if grid_size is not None:
+                self._grid_size = grid_size
+            if num_pokemon is not None:
+                self._number_pokemon = num_pokemon
+            self._seed = seed
+            self._pokemon_locations = () if pokemon_locations is None else pokemon_locations
+            self._game = GameBoard(self._grid_size,game,pokemon_locations,index_regions=True)
+            self._num_shown_pokemons = self._game.count(POKEMON)
+            self._reset = True
+    def restart(self):
+        """Cover every cell again, keeping the pokemons where they are."""
+        with self.batch():
+            self._game.reset()
+            self._num_shown_pokemons = 0
+            self._reset = True
+    def new_game(self):
+        """Cover every cell again and hide the pokemons somewhere new.
+        A lazy model leaves them unplaced until the first reveal."""
+        seed = random.getrandbits(64)
+        if self._lazy:
+            self.load(UNEXPOSED*self._grid_size**2,None,seed=seed)
+        else:
+            self._seed = seed
+            self.load(UNEXPOSED*self._grid_size**2,self.generate_pokemons(self._grid_size,self._number_pokemon),seed=seed)
+    def place_pokemons(self,index):
+        """Hide the pokemons away from index and its neighbours, if they are
+        still waiting for the first reveal.
+        Parameter:
+            index(int): The index of the cell being revealed."""
+        if self._game.get_pokemon_locations() is None:
+            self._pokemon_locations = self._game.place_pokemons(self._number_pokemon,index,self._seed,index_regions=True)
     def check_loss(self):
         """Returns True if the game has been lost, else False."""
-        if POKEMON in self._game:
-            return True
-        else:
-            return False
+        return self._num_shown_pokemons > 0
     def index_to_position(self,index):
         """Returns the (row, col) coordinate corresponding to the supplied index.
         Parameter:
@@ -122,7 +254,13 @@ class BoardModel:
         Returns:
             (str): The updated game string.
         """
-        self._game = self._game[:index] + character + self._game[index + 1:]
+        old = self._game[index]
+        if old != character:
+            with self.batch():
+                self._game[index] = character
+                # counted as they are shown, so the status needs no scan of the board
+                self._num_shown_pokemons += (character == POKEMON) - (old == POKEMON)
+                self._changes.append((index,old,character))
         return self._game
 
     def flag_cell(self, game, index):
@@ -165,13 +303,8 @@ class BoardModel:
         Returns:
             (list<int>): A list of index that has a neighbouring cell.
         """
-        neighbours = []
-        for direction in DIRECTIONS:
-            neighbour = self.index_in_direction(index, self._grid_size, direction)
-            if neighbour is not None:
-                neighbours.append(neighbour)
-
-        return neighbours
+        offsets, neighbours = neighbour_table(self._grid_size)
+        return neighbours[offsets[index]:offsets[index + 1]].tolist()
     
     def number_at_cell(self,game, pokemon_locations, grid_size, index):
         """Calculates what number should be displayed at that specific index in the game.
@@ -187,11 +320,7 @@ class BoardModel:
         """
         if self._game[index] != UNEXPOSED:
             return int(self._game[index])
-        number = 0
-        for neighbour in self.neighbour_directions(index, self._grid_size):
-            if neighbour in self._pokemon_locations:
-                number += 1
-        return number
+        return self._game.get_adjacency()[index]
     
     def reveal_cells(self,game, grid_size, pokemon_locations, index):
         """Reveals all neighbouring cells at index and repeats for all
@@ -208,14 +337,14 @@ class BoardModel:
         Returns:
             (str): The updated game string
         """
-        number = self.number_at_cell(game, pokemon_locations, self._grid_size, index)
-        self._game = self.replace_character_at_index(game,index, str(number))
-        clear = self.big_fun_search(game,self._grid_size,self._pokemon_locations,index)
-        print('!')
-        for i in clear:
-            if self._game[i] != FLAG:
-                number = self.number_at_cell(game, pokemon_locations, self._grid_size, i)
-                self._game = self.replace_character_at_index(game,i, str(number))
+        with self.batch():
+            number = self.number_at_cell(game, pokemon_locations, self._grid_size, index)
+            self._game = self.replace_character_at_index(game,index, str(number))
+            clear = self.big_fun_search(game,self._grid_size,self._pokemon_locations,index)
+            for i in clear:
+                if self._game[i] != FLAG:
+                    number = self.number_at_cell(game, pokemon_locations, self._grid_size, i)
+                    self._game = self.replace_character_at_index(game,i, str(number))
 
         return self._game
 
@@ -244,7 +373,6 @@ class BoardModel:
             (list<int>): List of cells to turn visible.
         """
         queue = [index]
-        discovered = [index]
         visible = []
         if self._game[index] == FLAG:
             return queue
@@ -253,12 +381,19 @@ class BoardModel:
         if number != 0:
             return queue
 
+        region = self._game.reveal_region(index)
+        if region is not None:
+            return [cell for cell in region if cell != index]
+
+        discovered = bytearray(self._grid_size**2)
+        discovered[index] = 1
+        offsets, neighbours = neighbour_table(self._grid_size)
         while queue:
             node = queue.pop()
-            for neighbour in self.neighbour_directions(node, self._grid_size):
-                if neighbour in discovered:
+            for neighbour in neighbours[offsets[node]:offsets[node + 1]]:
+                if discovered[neighbour]:
                     continue
-                discovered.append(neighbour)
+                discovered[neighbour] = 1
                
                 if self._game[neighbour] != FLAG:
                     number = self.number_at_cell(self._game, self._pokemon_locations, self._grid_size, neighbour)
@@ -273,20 +408,10 @@ class BoardModel:
             grid_size (int): The grid size of the game.
             number_of_pokemons (int): The number of pokemons that the game will have.
         Returns:
-            (tuple<int>): A tuple containing  indexes where the pokemons are
+            (PokemonLocations): A tuple containing  indexes where the pokemons are
             created for the game string.
         """
-        cell_count = self._grid_size ** 2
-        pokemon_locations = ()
-
-        for _ in range(self._number_pokemon):
-            if len(pokemon_locations) >= cell_count:
-                break
-            index = random.randint(0, cell_count-1)
-            while index in pokemon_locations:
-                index = random.randint(0, cell_count-1)
-            pokemon_locations += (index,)
-        return pokemon_locations
+        return generate_pokemons(self._grid_size, self._number_pokemon, self._seed)
 
     def write_file(self,path,data):
         """Create a new file to store data and write data in it
@@ -308,13 +433,13 @@ class BoardModel:
             (bool): True if the player has won the game, false if not.
 
         """
-        return UNEXPOSED not in self._game and self._game.count(FLAG) == len(self._pokemon_locations)
+        return self._game.get_num_unexposed() == 0 and self._game.get_num_flags() == len(self._pokemon_locations)
     
 class PokemonGame:
     """This class should manage necessary communication
     between any model and view classes, as well as event handling.
     """
-    def __init__(self,master,grid_size=10,num_pokemon=15,task=TASK_ONE):
+    def __init__(self,master,grid_size=10,num_pokemon=15,task=TASK_ONE,lazy=False,autosave=AUTOSAVE_FILE):
         """
         Construct a game.
         Parameters:
@@ -322,12 +447,24 @@ class PokemonGame:
             grid_size(int): The cell number of raws and columns
             num_pokemon(int): The number of pokemons
             task<str>: The name of the game which can be used to select games.
+            lazy(bool): Whether to wait for the first reveal to place the pokemons
+            autosave(str): The file to autosave to after every change, None for no autosave
         """
         self._master = master
         self._grid_size = grid_size
         self._num_pokemon = num_pokemon
         self._task = task
-        self._game = BoardModel(self._grid_size,self._num_pokemon)
+        self._game = BoardModel(self._grid_size,self._num_pokemon,lazy)
+        self._autosaver = None
+        self._last_session = None
+        if autosave is not None:
+            # read before the autosaver's first write rotates it away
+            try:
+                self._last_session = read_latest(autosave)
+            except ValueError:
+                pass
+            self._autosaver = Autosaver(autosave)
+            self._game.subscribe(self.autosave)
         #self._Time = Time()
 
         self._menuBar = tk.Menu(self._master)
@@ -336,83 +473,124 @@ class PokemonGame:
         self._menuBar.add_cascade(label="File", menu=self._fileMenu)
         self._fileMenu.add_command(label='Save Game', command=self.save_game)
         self._fileMenu.add_command(label='Load Game', command=self.load_game)
+        if self._autosaver is not None:
+            self._fileMenu.add_command(label='Load Autosave', command=self.load_autosave)
         self._fileMenu.add_command(label='Restart Game', command=self.restart_game)
         self._fileMenu.add_command(label='New Game', command=self.new_game)
         self._fileMenu.add_command(label='End Game', command=self.end_game)
         
+        self._master.protocol("WM_DELETE_WINDOW",self.close)
         self.draw()
 
+    def autosave(self,event=None):
+        """Hand a copy of the board to the autosaver, which writes it on its
+        own thread, so a move never waits on the disk.
+        Parameter:
+            event(BoardEvent): The change that made the autosave due."""
+        error = self._autosaver.pop_error()
+        if error is not None:
+            messagebox.showerror("Autosave",f"The game could not be autosaved: {error}")
+        self._autosaver.schedule(self._game.get_game().copy(index_regions=False),
+                                 self._game.get_grid_size(),self._game.get_num_pokemon(),
+                                 self._game.get_pokemon_location(),self._game.get_seed())
+
     def save_game(self):
         """Prompt the user for the location to save their le (using an appro-
         priate method of your choosing) and save all necessary information
         to replicate the current state of the game. Include appropriate error
-        handling."""
-        file_path="Saved_Game.txt"
-        grid_size = str(self._grid_size)+'\n'
-        pokeball = str(15-self._game.get_num_attempted_catches())+'\n'
-        game = str(self._game.get_game())+'\n'
-        pokemon_location=''
-        for i in range(14):
-            pokemon_location += str(self._game.get_pokemon_location()[i])+','
-        if not os.path.isfile(file_path):
-            self._game.write_file(file_path,'')
-        with open(file_path,'w') as file:
-            file.write(grid_size)
-            file.write(pokeball)
-            file.write(game)
-            file.write(pokemon_location)
-    
+        handling.
+        The game is saved to SAVE_FILE in the format of a1_save, which holds
+        boards of any size."""
+        try:
+            write_save(SAVE_FILE,self._game.get_game(),self._game.get_grid_size(),
+                       self._game.get_num_pokemon(),self._game.get_pokemon_location(),
+                       self._game.get_seed())
+        except OSError as error:
+            messagebox.showerror("Save Game",f"The game could not be saved: {error}")
+
     def load_game(self):
         """Prompt the user for the location of the le to load a game from
         and load the game described in that le. Include approriate error
-        handling."""
-        with open('Saved_Game.txt','r') as file:
-            game_list=file.readlines()
-        self._game._game=game_list[2].rstrip('\n')
-        pokemon_locations=game_list[3].split(',', 15)
-        pokemon_locations.remove('')
-        for i in range(15):
-            pokemon_locations[i]=int(pokemon_locations[i])
-        self._game._pokemon_locations=tuple(pokemon_locations)
-        self._board_view.draw_board(self._game.get_game())
-        print(self._game._pokemon_locations)
-        
+        handling.
+        A saved game of another size replaces the board view with one of its size."""
+        try:
+            saved = read_save(SAVE_FILE)
+        except (OSError,ValueError) as error:
+            messagebox.showerror("Load Game",f"The game could not be loaded: {error}")
+            return
+        self.show_saved_game(*saved)
+
+    def load_autosave(self):
+        """Load the game the last session autosaved, e.g. after it was killed.
+        It is read when this game starts, before this session's autosaves
+        replace it, so loading it does not touch the disk."""
+        if self._last_session is None:
+            messagebox.showerror("Load Autosave","There is no autosave from the last session.")
+            return
+        self.show_saved_game(*self._last_session)
+
+    def show_saved_game(self,grid_size,num_pokemon,game,pokemon_locations,seed):
+        """Replace the game with a saved one, replacing the board view with one
+        of its size if it differs.
+        Parameters:
+            See a1_save.unpack_game."""
+        resized = grid_size != self._grid_size
+        if resized:
+            self._game.unsubscribe(self._board_view.board_changed)
+            self._board_view.destroy()
+        self._grid_size = grid_size
+        self._num_pokemon = num_pokemon
+        self._game.load(game,pokemon_locations,grid_size,num_pokemon,seed)
+        if resized:
+            self.draw_board_view()
 
     def restart_game(self):
         """Restart the current game, including game timer. Pokemon locations
         should persist."""
-        self._game._game = UNEXPOSED*(self._grid_size*self._grid_size)
-        self._board_view.draw_board(self._game.get_game())
+        self._game.restart()
     def new_game(self):
         """Restart to a new game (i.e. new pokemon locations). Use the same
         grid size and number of pokemon as the current game."""
-        self._game._game = UNEXPOSED*(self._grid_size*self._grid_size)
-        self._game._pokemon_locations = self._game.generate_pokemons(self._grid_size, self._game.get_num_pokemon)
-        self._board_view.draw_board(self._game.get_game())
+        self._game.new_game()
     def end_game(self):
         """Prompt the player via messagebox to ask whether they are sure
         they would like to quit. If no, do nothing. If yes, quit the game
         (window should close and program should terminate)."""
         response = messagebox.askyesno("Quit the game","Would you like to quit the game?")
         if response:
+            self.close_autosaver()
             os._exit(0)
+    def close_autosaver(self):
+        """Write the last autosave and stop its thread."""
+        if self._autosaver is not None:
+            self._autosaver.close()
+    def close(self):
+        """Close the window once the last autosave is written."""
+        self.close_autosaver()
+        self._master.destroy()
     def draw(self):
         """Draw the title of the game and call Class BoardView to draw the board."""
         Title = tk.Label(self._master,text='Pokemon: Got 2 Find Them All!',bg='pink',font=50,fg='white')
         Title.pack(fill=tk.X)
+        self.draw_board_view()
+    def draw_board_view(self):
+        """Make the board view for the task and draw the board on it."""
         if self._task == TASK_ONE:
-            self._board_view = BoardView(self._master,self._grid_size,self._grid_size*cell_size,self._game)
+            self._board_view = BoardView(self._master,self._grid_size,self._grid_size*cell_size,self._game,close=self.close)
             self._board_view.draw_board(self._game.get_game())
             self._board_view.pack()
         elif self._task == TASK_TWO:
-            self._board_view = ImageBoardView(self._master,self._grid_size,self._grid_size*cell_size,self._game)
+            self._board_view = ImageBoardView(self._master,self._grid_size,self._grid_size*cell_size,self._game,close=self.close)
             self._board_view.draw_board(self._game.get_game())
             self._board_view.pack()
 
 class BoardView(tk.Canvas):
     """BoardView represents the GUI for the board. At the beginning of the game the board display 
-    all dark green squares. BoardView  inherit from tk.Canvas"""
+    all dark green squares. BoardView  inherit from tk.Canvas.
+    The close keyword argument is called to end the game once it is won or
+    lost, destroying master if it is not given."""
     def __init__(self,master,grid_size,board_width=600,*args,**kwargs):
+        self._close = kwargs.pop("close",master.destroy)
         super().__init__(master,**kwargs)
         self._master = master
         self._grid_size = grid_size
@@ -420,36 +598,76 @@ class BoardView(tk.Canvas):
         self.config(width=self._grid_size*cell_size,height=self._grid_size*cell_size)
         self._game = args[0]
         self._origin_box=None
+        self._shown=None
+        self.bind_clicks()
+        self._game.subscribe(self.board_changed)
 
     def draw_board(self,board):
         """Given an appropriate representation of the current state of the
         game board, draw the view to react this game state.
+        The canvas items of every cell are made on the first draw, after that
+        only the cells whose character changed are updated.
         Paremeter:
             board<str>:The game string."""
+        if self._shown is None:
+            self.create_cells()
+        shown = self._shown
+        for index,char in enumerate(str(board)):
+            if shown[index] != char:
+                self.draw_cell(index,char)
+                shown[index] = char
+
+    def board_changed(self,event):
+        """Redraw the cells a BoardEvent says have changed.
+        Parameter:
+            event(BoardEvent): The changes made to the model's board."""
+        if self._shown is None:
+            return
+        if event.is_reset():
+            self.draw_board(self._game.get_game())
+            return
+        shown = self._shown
+        for index,old,char in event.get_changes():
+            if shown[index] != char:
+                self.draw_cell(index,char)
+                shown[index] = char
+
+    def create_cells(self):
+        """Make the canvas items of every cell, all showing an unexposed cell."""
         self.delete(tk.ALL)
+        self._rectangles=[0]*self._grid_size**2
+        self._texts=[0]*self._grid_size**2
         for i in range(self._grid_size):
             for j in range(self._grid_size):
-                char = board[self._game.position_to_index((j,i),self._grid_size)]
+                index = self._game.position_to_index((j,i),self._grid_size)
                 x0=j*cell_size
                 y0=i*cell_size
-                x1=x0+cell_size
-                y1=y0+cell_size
-                if char =='~':
-                    """Color the unexposed cell as darkgreen"""
-                    self.create_rectangle(x0,y0,x1,y1, fill='darkgreen')    
-                elif char == POKEMON:
-                    """Color the exposed pokemon cell as yellow"""
-                    self.create_rectangle(x0,y0,x1,y1, fill='yellow')
-                    self.create_text(x0+cell_size/2,y0+cell_size/2,text=POKEMON,font=(42))
-                elif char == FLAG:
-                    """Color the flag cell as red"""
-                    self.create_rectangle(x0,y0,x1,y1, fill='red')
-                    self.create_text(x0+cell_size/2,y0+cell_size/2,text=FLAG,font=(42))
-                else:
-                    """Color the exposed cell as lightgreen and text the number of neighbor pokemons."""
-                    self.create_rectangle(x0,y0,x1,y1, fill='lightgreen')
-                    self.create_text(x0+cell_size/2,y0+cell_size/2,text=char,font=(42))
-        self.bind_clicks()
+                self._rectangles[index]=self.create_rectangle(x0,y0,x0+cell_size,y0+cell_size, fill='darkgreen')
+                self._texts[index]=self.create_text(x0+cell_size/2,y0+cell_size/2,text='',font=(42))
+        self._highlight=self.create_rectangle(0,0,0,0,outline="red")
+        self._shown=[UNEXPOSED]*self._grid_size**2
+
+    def draw_cell(self,index,char):
+        """Update the canvas items of one cell to show char.
+        Parameter:
+            index(int): The index of the cell in the game string.
+            char(str): The character of the cell in the game string."""
+        if char =='~':
+            """Color the unexposed cell as darkgreen"""
+            self.itemconfigure(self._rectangles[index], fill='darkgreen')
+            self.itemconfigure(self._texts[index], text='')
+        elif char == POKEMON:
+            """Color the exposed pokemon cell as yellow"""
+            self.itemconfigure(self._rectangles[index], fill='yellow')
+            self.itemconfigure(self._texts[index], text=POKEMON)
+        elif char == FLAG:
+            """Color the flag cell as red"""
+            self.itemconfigure(self._rectangles[index], fill='red')
+            self.itemconfigure(self._texts[index], text=FLAG)
+        else:
+            """Color the exposed cell as lightgreen and text the number of neighbor pokemons."""
+            self.itemconfigure(self._rectangles[index], fill='lightgreen')
+            self.itemconfigure(self._texts[index], text=char)
         
     def _left_click(self,x,y):
         """Control the behavior of the game when a cell is clicked by left button.
@@ -458,18 +676,19 @@ class BoardView(tk.Canvas):
         pixel=x,y
         position=self.pixel_to_position(pixel)
         index = self._game.position_to_index(position,self._grid_size)
+        if self._game.get_game()[index]!=FLAG:
+            self._game.place_pokemons(index)
         if self._game.get_game()[index]==FLAG:
             """Left click on an 'attempted catch' square will not change to game view."""
-            self.draw_board(self._game.get_game())
         elif index in self._game.get_pokemon_location():
             """If Left click on tall grass square with hidden pokemon,
             Yellow rectangles for squares that hide pokemon (including any previously caught pokemon) will be show.
             Present a messagebox to tell the player they loss and quit the game."""
-            for k in self._game.get_pokemon_location():
-                self._game.replace_character_at_index(self._game,k,POKEMON)
-            self.draw_board(self._game.get_game())
+            with self._game.batch():
+                for k in self._game.get_pokemon_location():
+                    self._game.replace_character_at_index(self._game,k,POKEMON)
             messagebox.showinfo("Game Over", "You loss! :D")
-            self._master.destroy()
+            self._close()
         elif index not in self._game.get_pokemon_location():
             """If Left click on tall grass square with no hidden pokemon,
             light green colour with superimposed text displaying the number of surrounding pokemon. 
@@ -479,7 +698,6 @@ class BoardView(tk.Canvas):
                 self._game.reveal_cells(self._game.get_game(), self._grid_size, self._game.get_pokemon_location, index)
             else:
                 self._game.replace_character_at_index(self._game,index,number)
-            self.draw_board(self._game.get_game())
 
     def _right_click(self,x,y):
         """If Right click on unexposed square,
@@ -490,10 +708,9 @@ class BoardView(tk.Canvas):
         position=self.pixel_to_position(pixel)
         index = self._game.position_to_index(position,self._grid_size)        
         self._game.flag_cell(self._game, index)
-        self.draw_board(self._game.get_game())   
         if self._game.check_win(self._game.get_game(), self._game.get_pokemon_location):
             messagebox.showinfo("Game Over", "You won! :D")
-            self._master.destroy()
+            self._close()
             
     def highlight(self,x,y):
         """When the game is run in TASK ONE mode, motion onto a grid square should cause a border to
@@ -503,11 +720,9 @@ class BoardView(tk.Canvas):
             (x,y)<tuple(int,int)>: The pixel of current mouse location."""
         pixel = x,y
         current_box= self.get_bbox(pixel)
-        if current_box!=self._origin_box:
-            if self._origin_box is not None:
-                self.create_rectangle(self._origin_box[0],self._origin_box[1],self._origin_box[2],self._origin_box[3],outline=None) 
+        if current_box!=self._origin_box and self._shown is not None:
+            self.coords(self._highlight,*current_box)
             self._origin_box = current_box
-        self._highlight=self.create_rectangle(current_box[0],current_box[1],current_box[2],current_box[3],outline="red")
         
         
     def bind_clicks(self):
@@ -560,63 +775,47 @@ class ImageBoardView(BoardView):
         self.config(width=self._grid_size*cell_size,height=self._grid_size*cell_size)
         self._game = args[0]
         #self._Title = args[1]
-        self._images=[]
-        self._origin_box=None
+        self._hover=None
 
-    def draw_board(self,board):
-        """Given an appropriate representation of the current state of the
-        game board, draw the view to react this game state.
-        Paremeter:
-            board<str>:The game string."""
+    def create_cells(self):
+        """Make the image item of every cell, all showing tall grass."""
         self.delete(tk.ALL)
-        self._images.clear()
-        image1 = get_image("images/pokemon_sprites/togepi")
-        image2 = get_image("images/pokemon_sprites/charizard")
-        image3 = get_image("images/pokemon_sprites/cyndaquil")
-        image4 = get_image("images/pokemon_sprites/pikachu")
-        image5 = get_image("images/pokemon_sprites/psyduck")
-        image6 = get_image("images/pokemon_sprites/umbreon")
-        pokemon_list=[image1,image2,image3,image4,image5,image6]
-        adjacent0 = get_image("images/zero_adjacent")
-        adjacent1 = get_image("images/one_adjacent")
-        adjacent2 = get_image("images/two_adjacent")
-        adjacent3 = get_image("images/three_adjacent")
-        adjacent4 = get_image("images/four_adjacent")
-        adjacent5 = get_image("images/five_adjacent")
-        adjacent6 = get_image("images/six_adjacent")
-        adjacent7 = get_image("images/seven_adjacent")
-        adjacent8 = get_image("images/eight_adjacent")
-        near_pokemons=[adjacent0,adjacent1,adjacent2,adjacent3,adjacent4,adjacent5,adjacent6,adjacent7,adjacent8]
+        image0 = get_image("images/unrevealed")
+        self._items=[0]*self._grid_size**2
+        self._images=[image0]*self._grid_size**2
         for i in range(self._grid_size):
             for j in range(self._grid_size):
+                index = self._game.position_to_index((j,i),self._grid_size)
                 x0=j*cell_size
                 y0=i*cell_size
-                char = board[self._game.position_to_index((j,i),self._grid_size)]
-                if char =='~':
-                    """Give the Unexposed cell tall grass"""
-                    image0 = get_image("images/unrevealed")
-                    self.create_image(x0+cell_size/2,y0+cell_size/2,image=image0)
-                    self._images.append(image0)
-                elif char == POKEMON:
-                    """Give the exposed pokemon cell the pokemons images."""
-                    pokemon_image = pokemon_list[random.randint(0, 5)]
-                    self.create_image(x0+cell_size/2,y0+cell_size/2,image=pokemon_image)
-                    self._images.append(pokemon_image)
-
-                elif char == FLAG:
-                    """Give the Flag cell pokemon ball."""
-                    image7 = get_image("images/pokeball")
-                    self.create_image(x0+cell_size/2,y0+cell_size/2,image=image7)
-                    self._images.append(image7)
-             
-                else:
-                    """Give the exposed cell short grass."""
-                    adjacent = near_pokemons[int(char)]
-                    self.create_image(x0+cell_size/2,y0+cell_size/2,image=adjacent)
-                    self._images.append(adjacent)
+                self._items[index]=self.create_image(x0+cell_size/2,y0+cell_size/2,image=image0)
+        self._hover=None
+        self._shown=[UNEXPOSED]*self._grid_size**2
+
+    def draw_cell(self,index,char):
+        """Update the image of one cell to show char.
+        The view keeps a reference to every image it shows, so they stay on
+        screen even if the image cache is cleared.
+        Parameter:
+            index(int): The index of the cell in the game string.
+            char(str): The character of the cell in the game string."""
+        if char =='~':
+            """Give the Unexposed cell tall grass"""
+            image = get_image("images/unrevealed")
+        elif char == POKEMON:
+            """Give the exposed pokemon cell the pokemons images."""
+            image = get_image("images/pokemon_sprites/"+POKEMON_SPRITES[random.randint(0, 5)])
+        elif char == FLAG:
+            """Give the Flag cell pokemon ball."""
+            image = get_image("images/pokeball")
+        else:
+            """Give the exposed cell short grass."""
+            image = get_image("images/"+ADJACENT_IMAGES[int(char)])
+        self.itemconfigure(self._items[index],image=image)
+        self._images[index]=image
+        if index == self._hover:
+            self._hover=None
 
-        self.bind_clicks()
-        
     def _left_click(self,x,y):
         """Control the behavior of the game when a cell is clicked by left button.
         Parameter:
@@ -624,17 +823,18 @@ class ImageBoardView(BoardView):
         pixel=x,y
         position=self.pixel_to_position(pixel)
         index = self._game.position_to_index(position,self._grid_size)
+        if self._game.get_game()[index]!=FLAG:
+            self._game.place_pokemons(index)
         if self._game.get_game()[index]==FLAG:
             """Left click on an 'attempted catch' square will not change to game view."""
-            self.draw_board(self._game.get_game())
         elif index in self._game.get_pokemon_location():
             """If Left click on tall grass square with hidden pokemon,
             `Expose' all hidden pokemon, and provide a tkinter messagebox to tell the user they lost the game."""
-            for k in self._game.get_pokemon_location():
-                self._game.replace_character_at_index(self._game,k,POKEMON)           
-            self.draw_board(self._game.get_game())
+            with self._game.batch():
+                for k in self._game.get_pokemon_location():
+                    self._game.replace_character_at_index(self._game,k,POKEMON)
             messagebox.showinfo("Game Over", "You loss! :D")
-            self._master.destroy()
+            self._close()
         elif index not in self._game.get_pokemon_location():
             """If Left click on tall grass square with no hidden pokemon,
             `Expose' tall grass to short grass."""
@@ -643,7 +843,6 @@ class ImageBoardView(BoardView):
                 self._game.reveal_cells(self._game.get_game(), self._grid_size, self._game.get_pokemon_location, index)
             else:
                 self._game.replace_character_at_index(self._game,index,number)
-            self.draw_board(self._game.get_game())
 
     def _right_click(self,x,y):
         """If Right click on unexposed square,
@@ -654,34 +853,26 @@ class ImageBoardView(BoardView):
         position=self.pixel_to_position(pixel)
         index = self._game.position_to_index(position,self._grid_size)        
         self._game.flag_cell(self._game, index)
-        self._game.set_num_pokemon(self._game.get_num_pokemon()-1)
-        #self._label.config(text = f"{self._game.get_num_pokemon()} pokemons left")
-        self.draw_board(self._game.get_game())
         if self._game.check_win(self._game.get_game(), self._game.get_pokemon_location):
             messagebox.showinfo("Game Over", "You won! :D")
-            self._master.destroy()
+            self._close()
 
     def highlight(self,x,y):
         """motion on tall grass squares should cause the grass to `rustle'. 
         Motion onto a tall grass square should cause the image to change to the `unexposed moved.png' image, 
         whereas motion on a tall grass square should restore the image to the `unexposed.png' image."""
         pixel = x,y
-        image_highlight = get_image("images/unrevealed_moved")
-        image_common = get_image("images/unrevealed")
-        current_box= self.get_bbox(pixel)
         position=self.pixel_to_position(pixel)
         index = self._game.position_to_index(position,self._grid_size)
-        if self._game.get_game()[index]=='~':
-            if current_box!=self._origin_box:
-                if self._origin_box is not None:
-                    position1=self.pixel_to_position((self._origin_box[0],self._origin_box[1]))
-                    index1 = self._game.position_to_index(position1,self._grid_size)
-                    if self._game.get_game()[index1]=='~':
-                        self.create_image(self._origin_box[0]+cell_size/2,self._origin_box[1]+cell_size/2,image=image_common)
-                        self._images.append(image_common)
-                self._origin_box = current_box
-            self._highlight=self.create_image(current_box[0]+cell_size/2,current_box[1]+cell_size/2,image=image_highlight)
-            self._images.append(image_highlight)        
+        if self._shown is None or index == self._hover:
+            return
+        if self._hover is not None:
+            self.draw_cell(self._hover,UNEXPOSED)
+        if self._shown[index]=='~':
+            image_highlight = get_image("images/unrevealed_moved")
+            self.itemconfigure(self._items[index],image=image_highlight)
+            self._images[index]=image_highlight
+            self._hover=index
         
     def bind_clicks(self):
         """Bind clicks on a label to the left and right click handlers.
@@ -739,17 +930,29 @@ class ImageBoardView(BoardView):
         self.label.config(image = get_image("images/clock"),text=f"{mins}m'\n'{seconds}s")
         self.root.after(1000,self.update_clock)"""
         
+_image_cache = {}
+
 def get_image(image_name):
     """(tk.PhotoImage) Get a image file based on capability.
 
-    If a .png doesn't work, default to the .gif image.
+    If a .png doesn't work, default to the .gif image. Each image is only
+    loaded once, and later calls share the same PhotoImage.
     """
-    try:
-        image = tk.PhotoImage(file=image_name + ".png")
-    except tk.TclError:
-        image = tk.PhotoImage(file=image_name + ".gif")
+    image = _image_cache.get(image_name)
+    if image is None:
+        try:
+            image = tk.PhotoImage(file=image_name + ".png")
+        except tk.TclError:
+            image = tk.PhotoImage(file=image_name + ".gif")
+        _image_cache[image_name] = image
     return image
 
+def clear_image_cache():
+    """Forget every loaded image so the next get_image reads the files again,
+    e.g. after the images are swapped for another theme. Views keep the
+    images they are showing until they next draw."""
+    _image_cache.clear()
+
 def main():
     root = tk.Tk()
     root.title("Pokemon:Got 2 Find Them All!")
@@ -4,7 +4,11 @@ Tests for CSSE1001 / 7030 Assignment 1
 
 __author__ = "Steven Summers"
 
+import io
+import json
+import os
 import random
+import tempfile
 import inspect
 from pathlib import Path
 from typing import Tuple, List
@@ -66,6 +70,15 @@ class TestA1(OrderedTestCase):
 
     a1: A1
     a1_support: ...
+    a1_board: ...
+    a1_simulator: ...
+    a1_solver: ...
+    a1_benchmark: ...
+    a1_log: ...
+    a1_noguess: ...
+    a1_save: ...
+    a1_autosave: ...
+    a3: ...
 
 
 class TestDesign(TestA1):
@@ -437,6 +450,846 @@ class TestCheckWin(TestFunctionality):
         self.assertIs(result, False)
 
 
+class TestGameBoard(TestFunctionality):
+    """ Tests the array backed GameBoard """
+
+    def test_string_form(self):
+        """ test board converts to and from the game string """
+        board = self.a1.GameBoard(3, "☺♥1♥31110")
+        self.assertEqual(str(board), "☺♥1♥31110")
+        self.assertEqual(board, "☺♥1♥31110")
+        self.assertEqual(board.count(self.a1_support.FLAG), 2)
+
+    def test_replace_in_place(self):
+        """ test replace character writes the board in place """
+        board = self.a1.GameBoard(self.grid_size)
+        result = self.a1.replace_character_at_index(board, 4, '3')
+        self.assertIs(result, board)
+        self.assertEqual(str(board), "~~~~3~~~~")
+
+    def test_flag_cell(self):
+        """ test flag cell on a board """
+        board = self.a1.GameBoard(self.grid_size)
+        self.a1.flag_cell(board, 4)
+        self.assertEqual(str(board), "~~~~♥~~~~")
+        self.a1.flag_cell(board, 4)
+        self.assertEqual(str(board), self.game)
+
+    def test_reveal_cells(self):
+        """ test reveal cells on a board matches the game string """
+        pokemon_locations = self.get_pokemon_locations(5, 3)
+        expected = self.a1.reveal_cells('~' * 25, 5, pokemon_locations, 24)
+        board = self.a1.GameBoard(5)
+        self.a1.reveal_cells(board, 5, pokemon_locations, 24)
+        self.assertEqual(str(board), expected)
+
+
+class TestNeighbourTable(TestFunctionality):
+    """ Tests the precomputed neighbour table """
+
+    def test_matches_directions(self):
+        """ test table agrees with index_in_direction """
+        for grid_size in (1, 2, 3, 5):
+            offsets, neighbours = self.a1.neighbour_table(grid_size)
+            for index in range(grid_size ** 2):
+                expected = []
+                for direction in self.a1_support.DIRECTIONS:
+                    neighbour = self.a1.index_in_direction(index, grid_size, direction)
+                    if neighbour is not None:
+                        expected.append(neighbour)
+                result = list(neighbours[offsets[index]:offsets[index + 1]])
+                self.assertEqual(result, expected)
+
+    def test_cached(self):
+        """ test table is only built once per grid size """
+        self.assertIs(self.a1.neighbour_table(6), self.a1.neighbour_table(6))
+
+
+class TestAdjacencyCounts(TestFunctionality):
+    """ Tests the adjacency counts stored with a board """
+
+    def test_matches_number_at_cell(self):
+        """ test counts agree with number_at_cell on the game string """
+        grid_size = 6
+        pokemon_locations = self.get_pokemon_locations(grid_size, 8)
+        counts = self.a1_board.adjacency_counts(pokemon_locations, grid_size)
+        game = '~' * grid_size ** 2
+        expected = [self.a1.number_at_cell(game, pokemon_locations, grid_size, i)
+                    for i in range(grid_size ** 2)]
+        self.assertEqual(list(counts), expected)
+
+    def test_board_lookup(self):
+        """ test number_at_cell reads the board's counts """
+        pokemon_locations = self.get_pokemon_locations(self.grid_size, 3)
+        board = self.a1.GameBoard(self.grid_size, pokemon_locations=pokemon_locations)
+        result = self.a1.number_at_cell(board, pokemon_locations, self.grid_size, 4)
+        self.assertEqual(result, 3)
+
+
+class TestPokemonLocations(TestFunctionality):
+    """ Tests the bitset backed pokemon locations """
+
+    def test_behaves_like_tuple(self):
+        """ test generated locations still compare and iterate as a tuple """
+        pokemon_locations = self.get_pokemon_locations(self.grid_size, 3)
+        self.assertEqual(pokemon_locations, (0, 3, 1))
+        self.assertEqual(list(pokemon_locations), [0, 3, 1])
+        self.assertEqual(len(pokemon_locations), 3)
+
+    def test_membership(self):
+        """ test membership against the bitset """
+        pokemon_locations = self.a1_support.PokemonLocations((12, 0, 7), 16)
+        for index in range(-1, 20):
+            self.assertEqual(index in pokemon_locations, index in (12, 0, 7))
+
+
+class TestBigFunSearch(TestFunctionality):
+    """ Tests big_fun_search """
+
+    def test_empty_board(self):
+        """ test an empty board reveals every other cell """
+        grid_size = 30
+        pokemon_locations = self.a1_support.PokemonLocations((), grid_size ** 2)
+        result = self.a1.big_fun_search('~' * grid_size ** 2, grid_size, pokemon_locations, 0)
+        self.assertEqual(sorted(result), list(range(1, grid_size ** 2)))
+
+    def test_flags_block_search(self):
+        """ test flagged cells are revealed around but not searched through """
+        game = "~♥~~♥~~♥~"
+        result = self.a1.big_fun_search(game, self.grid_size, (), 0)
+        self.assertListSimilar(result, [1, 3, 4, 6, 7])
+
+    def test_flagged_start(self):
+        """ test searching from a flag only returns the flag """
+        result = self.a1.big_fun_search("♥~~~~~~~~", self.grid_size, (), 0)
+        self.assertEqual(result, [0])
+
+
+class TestRevealIndex(TestFunctionality):
+    """ Tests the zero region index """
+
+    def test_matches_search(self):
+        """ test indexed regions reveal the same cells as searching """
+        grid_size = 8
+        pokemon_locations = self.get_pokemon_locations(grid_size, 6)
+        board = self.a1.GameBoard(grid_size, pokemon_locations=pokemon_locations,
+                                  index_regions=True)
+        game = str(board)
+        for index in range(grid_size ** 2):
+            if index in pokemon_locations:
+                continue
+            result = self.a1.big_fun_search(board, grid_size, pokemon_locations, index)
+            expected = self.a1.big_fun_search(game, grid_size, pokemon_locations, index)
+            self.assertListSimilar(result, expected)
+
+    def test_flag_blocks_region(self):
+        """ test a flagged zero cell sends the reveal back to searching """
+        pokemon_locations = self.a1_support.PokemonLocations((), 9)
+        board = self.a1.GameBoard(self.grid_size, pokemon_locations=pokemon_locations,
+                                  index_regions=True)
+        self.assertIsNotNone(board.reveal_region(0))
+        for index in (1, 4, 7):
+            self.a1.flag_cell(board, index)
+        self.assertIsNone(board.reveal_region(0))
+        result = self.a1.big_fun_search(board, self.grid_size, pokemon_locations, 0)
+        self.assertListSimilar(result, [1, 3, 4, 6, 7])
+        self.a1.flag_cell(board, 4)
+        self.assertIsNone(board.reveal_region(0))
+        board.reset()
+        self.assertIsNotNone(board.reveal_region(0))
+
+
+class TestGeneratePokemons(TestFunctionality):
+    """ Tests generate_pokemons """
+
+    def test_dense_board(self):
+        """ test a nearly full board places every pokemon once """
+        random.seed(SEED)
+        result = self.a1_support.generate_pokemons(10, 97)
+        self.assertEqual(len(set(result)), 97)
+        self.assertTrue(all(0 <= index < 100 for index in result))
+        self.assertTrue(all(index in result for index in result))
+
+    def test_full_board(self):
+        """ test asking for more pokemons than cells fills the board """
+        random.seed(SEED)
+        result = self.a1_support.generate_pokemons(3, 20)
+        self.assertListSimilar(list(result), list(range(9)))
+
+
+class TestSeededGeneration(TestFunctionality):
+    """ Tests generating boards from explicit seeds """
+
+    def test_explicit_seed(self):
+        """ test a seed or generator matches seeding the random module """
+        expected = self.get_pokemon_locations(self.grid_size, 3)
+        self.assertEqual(self.a1_support.generate_pokemons(3, 3, SEED), expected)
+        self.assertEqual(self.a1_support.generate_pokemons(3, 3, random.Random(SEED)), expected)
+
+    def test_independent_of_global_state(self):
+        """ test seeded generation ignores the random module's state """
+        random.seed(1)
+        first = self.a1_support.generate_pokemons(10, 20, SEED)
+        random.seed(2)
+        second = self.a1_support.generate_pokemons(10, 20, SEED)
+        self.assertEqual(first, second)
+
+    def test_child_rngs(self):
+        """ test child generators are reproducible and distinct """
+        first = [self.a1_support.generate_pokemons(10, 20, rng)
+                 for rng in self.a1_support.child_rngs(SEED, 4)]
+        second = [self.a1_support.generate_pokemons(10, 20, rng)
+                  for rng in self.a1_support.child_rngs(SEED, 4)]
+        self.assertEqual(first, second)
+        self.assertEqual(len(set(first)), 4)
+
+
+class TestBoardCounts(TestFunctionality):
+    """ Tests the running counts kept by a board """
+
+    def test_counts_follow_moves(self):
+        """ test counts follow flags and reveals """
+        pokemon_locations = self.get_pokemon_locations(self.grid_size, 3)
+        board = self.a1.GameBoard(self.grid_size, pokemon_locations=pokemon_locations)
+        self.a1.flag_cell(board, 0)
+        self.a1.flag_cell(board, 8)
+        self.assertEqual(board.get_num_flags(), 2)
+        self.assertEqual(board.get_num_correct_flags(), 1)
+        self.a1.reveal_cells(board, self.grid_size, pokemon_locations, 4)
+        self.assertEqual(board.get_num_unexposed(), 6)
+        self.a1.flag_cell(board, 8)
+        self.assertEqual(board.get_num_flags(), 1)
+        self.assertEqual(board.get_num_unexposed(), 7)
+
+    def test_check_win(self):
+        """ test check win on a board agrees with the game string """
+        pokemon_locations = self.get_pokemon_locations(self.grid_size, 3)
+        for game in ("♥♥1♥31110", "♥♥♥♥♥♥♥♥♥", "♥♥~♥~~~~~"):
+            board = self.a1.GameBoard(self.grid_size, game, pokemon_locations)
+            self.assertIs(self.a1.check_win(board, pokemon_locations),
+                          self.a1.check_win(game, pokemon_locations))
+
+
+class TestTerminalRenderer(TestFunctionality):
+    """ Tests the incremental terminal renderer """
+
+    def test_first_draw_matches_display(self):
+        """ test the first draw prints the full board """
+        renderer = self.a1.TerminalRenderer(self.grid_size)
+        with RedirectStdIO(stdout=True) as stdio:
+            renderer.draw(self.game)
+        self.assertMultiLineEqual(stdio.stdout, self.load_test_data("display_game_simple.out"))
+
+    def test_redraws_changed_rows(self):
+        """ test later draws only rewrite changed rows """
+        renderer = self.a1.TerminalRenderer(self.grid_size)
+        with RedirectStdIO(stdout=True):
+            renderer.draw(self.game)
+        with RedirectStdIO(stdout=True) as stdio:
+            renderer.draw("~~~~1~~~~")
+        self.assertEqual(stdio.stdout, "\x1b[4A\rB | ~ | 1 | ~ |\x1b[K\x1b[4B\r")
+        with RedirectStdIO(stdout=True) as stdio:
+            renderer.draw("~~~~1~~~~")
+        self.assertEqual(stdio.stdout, "")
+
+
+class TestLargeGrid(TestFunctionality):
+    """ Tests boards with more than 26 rows """
+
+    def test_row_labels(self):
+        """ test row labels continue past Z """
+        labels = [self.a1_support.row_label(row) for row in (0, 25, 26, 27, 51, 52, 701, 702)]
+        self.assertEqual(labels, ['A', 'Z', 'AA', 'AB', 'AZ', 'BA', 'ZZ', 'AAA'])
+
+    def test_parse_double_letter(self):
+        """ test parse a row past Z """
+        self.assertEqual(self.a1.parse_position('AB3', 30), (27, 2))
+        self.assertIsNone(self.a1.parse_position('AB3', 27))
+        self.assertIsNone(self.a1.parse_position('E1', 4))
+
+    def test_display_aligned(self):
+        """ test every displayed line has the same width on a large board """
+        with RedirectStdIO(stdout=True) as stdio:
+            self.a1.display_game('~' * 120 ** 2, 120)
+        lines = stdio.stdout.splitlines()
+        self.assertEqual(len(lines), 2 + 2 * 120)
+        self.assertEqual(len(set(map(len, lines[::2]))), 1)
+        self.assertEqual(len(set(map(len, lines[1::2]))), 1)
+        self.assertEqual(len(lines[1]), len(lines[0]) + 1)
+        self.assertTrue(lines[-2].startswith(self.a1_support.row_label(119) + ' | ~'))
+
+
+class TestChunkedBoard(TestFunctionality):
+    """ Tests the sparse chunked board """
+
+    def test_deterministic_chunks(self):
+        """ test pokemons depend only on the seed """
+        first = self.a1_board.ChunkedBoard(150, 0.1, seed=SEED)
+        second = self.a1_board.ChunkedBoard(150, 0.1, seed=SEED)
+        # place the chunks of the second board in the opposite order
+        for index in reversed(range(0, 150 ** 2, 64)):
+            self.assertEqual(index in second.get_pokemon_locations(),
+                             index in first.get_pokemon_locations())
+        self.assertEqual(list(first.get_pokemon_locations()), list(second.get_pokemon_locations()))
+        self.assertEqual(len(first.get_pokemon_locations()), len(list(first.get_pokemon_locations())))
+
+    def test_reveal_across_chunks(self):
+        """ test reveals match a dense board holding the same pokemons """
+        board = self.a1_board.ChunkedBoard(100, 0.12, seed=SEED)
+        pokemon_locations = board.get_pokemon_locations()
+        dense_locations = self.a1_support.PokemonLocations(list(pokemon_locations), 100 ** 2)
+        dense = self.a1.GameBoard(100, pokemon_locations=dense_locations)
+        for index in range(63 * 100 + 60, 63 * 100 + 70):
+            if index in dense_locations or dense[index] != '~':
+                continue
+            self.a1.reveal_cells(board, 100, pokemon_locations, index)
+            self.a1.reveal_cells(dense, 100, dense_locations, index)
+        self.assertEqual(str(board), str(dense))
+        self.assertEqual(board.get_num_unexposed(), dense.get_num_unexposed())
+
+    def test_sparse_memory(self):
+        """ test a huge board only allocates the chunks that are written """
+        board = self.a1_board.ChunkedBoard(10 ** 6, 0.2, seed=SEED)
+        self.a1.flag_cell(board, 0)
+        self.a1.flag_cell(board, 10 ** 12 - 1)
+        self.assertEqual(board.get_num_chunks(), 2)
+        self.assertEqual(board.get_num_flags(), 2)
+        self.assertEqual(board[10 ** 6], '~')
+
+
+class TestSimulator(TestFunctionality):
+    """ Tests the headless game simulator """
+
+    def test_play_game_reproducible(self):
+        """ test a seeded game always plays out the same """
+        first = self.a1_simulator.play_game(5, 3, self.a1_simulator.random_policy, SEED)
+        second = self.a1_simulator.play_game(5, 3, self.a1_simulator.random_policy, SEED)
+        self.assertEqual(first, second)
+
+    def test_simulate(self):
+        """ test results add up and do not depend on batching """
+        first = self.a1_simulator.simulate(50, 4, 1, seed=SEED, workers=0, batch_size=7)
+        second = self.a1_simulator.simulate(50, 4, 1, seed=SEED, workers=0, batch_size=50)
+        self.assertEqual(first['games'], 50)
+        self.assertGreater(first['wins'], 0)
+        for key in ('games', 'wins', 'win_rate', 'moves_per_game'):
+            self.assertEqual(first[key], second[key])
+
+    def test_stuck_policy(self):
+        """ test a policy with no playable move ends the game """
+        self.assertEqual(self.a1_simulator.play_game(4, 2, lambda game, grid_size, rng: [], SEED),
+                         (False, 0))
+        self.assertEqual(self.a1_simulator.play_game(4, 2, lambda game, grid_size, rng: [(self.a1_simulator.REVEAL, 0)] * 3,
+                                                     SEED, max_moves=50)[0], False)
+        game = self.a1_board.GameBoard(2, "1111", (0,))
+        self.assertEqual(self.a1_simulator.random_policy(game, 2, random.Random(SEED)), [])
+
+
+class TestSolver(TestFunctionality):
+    """ Tests the constraint solver """
+
+    def test_single_cell(self):
+        """ test numbers touching only one unknown cell """
+        safe, pokemons = self.a1_solver.solve("0000" + "0111" + "01~~" + "01~~", 4)
+        self.assertEqual(pokemons, {10})
+        self.assertEqual(safe, {11, 14})
+
+    def test_pairs(self):
+        """ test the 1-2-1 pattern which needs pairs of numbers """
+        game = "12110" + "~~~~~" + "~~~~~" + "~~~~~" + "~~~~~"
+        safe, pokemons = self.a1_solver.solve(game, 5)
+        self.assertEqual(pokemons, {5, 7})
+        self.assertEqual(safe, {6, 8, 9})
+
+    def test_subset(self):
+        """ test a number whose cells contain another number's cells """
+        safe, pokemons = self.a1_solver.solve("01~" + "01~" + "01~", 3)
+        self.assertEqual(pokemons, {5})
+        self.assertEqual(safe, {2, 8})
+
+    def test_pokemon_count(self):
+        """ test the pokemon count settles the cells no number touches """
+        game = "0000" + "1110" + "~~10" + "~~10"
+        self.assertEqual(self.a1_solver.solve(game, 4)[0], {8, 13})
+        safe, pokemons = self.a1_solver.solve(game, 4, number_of_pokemons=1)
+        self.assertEqual(pokemons, {9})
+        self.assertEqual(safe, {8, 12, 13})
+
+    def test_never_wrong(self):
+        """ test the solver only reports what is true of real boards """
+        random.seed(SEED)
+        for _ in range(20):
+            locations = self.a1_support.generate_pokemons(8, 10)
+            game = self.a1_board.GameBoard(8, pokemon_locations=locations)
+            adjacency = game.get_adjacency()
+            openings = [i for i in range(64) if adjacency[i] == 0 and i not in locations]
+            if not openings:
+                continue
+            game = self.a1.reveal_cells(game, 8, locations, openings[0])
+            safe, pokemons = self.a1_solver.solve(game, 8, len(locations))
+            self.assertTrue(safe.isdisjoint(locations))
+            self.assertTrue(pokemons.issubset(locations))
+
+
+class TestBenchmarkBudget(TestFunctionality):
+    """ Tests comparing benchmark results against a baseline """
+
+    def test_compare(self):
+        """ test only results outside the budget are reported """
+        baseline = {"check_win/10/0.05": {"ops_per_second": 1000.0, "peak_kib": 10.0},
+                    "display_game/10/0.05": {"ops_per_second": 1000.0, "peak_kib": 10.0}}
+        results = {"check_win/10/0.05": {"ops_per_second": 850.0, "peak_kib": 11.0},
+                   "display_game/10/0.05": {"ops_per_second": 700.0, "peak_kib": 14.0},
+                   "reveal_cells/10/0.05": {"ops_per_second": 1.0, "peak_kib": 1.0}}
+        regressions = self.a1_benchmark.compare(results, baseline, budget=20)
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(all(r.startswith("display_game/10/0.05") for r in regressions))
+        self.assertEqual(self.a1_benchmark.compare(results, baseline, budget=50), [])
+
+    def test_measure(self):
+        """ test a measurement has both figures """
+        result = self.a1_benchmark.measure(lambda: [0] * 1000, min_time=0.01)
+        self.assertGreater(result["ops_per_second"], 0)
+        self.assertGreater(result["peak_kib"], 0)
+
+
+class TestSessionLog(TestFunctionality):
+    """ Tests recording and replaying binary session logs """
+
+    def test_round_trip(self):
+        """ test a log reads back what was recorded """
+        recorder = self.a1_log.SessionRecorder(-5, 40, 12)
+        recorder.flag(3)
+        recorder.reveal(1599)
+        recorder.restart()
+        recorder.quit()
+        seed, grid_size, number, actions = self.a1_log.read_session(recorder.get_bytes())
+        self.assertEqual((seed, grid_size, number), (-5, 40, 12))
+        log = self.a1_log
+        self.assertEqual(actions, [(log.FLAG_CODE, 3), (log.REVEAL_CODE, 1599),
+                                   (log.RESTART_CODE, 0), (log.QUIT_CODE, 0)])
+        with self.assertRaises(ValueError):
+            self.a1_log.read_session(b"A1LG\x09")
+
+    def test_truncated(self):
+        """ test cut short logs are refused """
+        data = self.a1_log.SessionRecorder(7, 300, 12).get_bytes()
+        for truncated in (b"", b"A1LG", data[:6], data[:-1], data + b"\x80"):
+            with self.assertRaises(ValueError):
+                self.a1_log.read_session(truncated)
+
+    def test_outside_grid(self):
+        """ test actions outside the grid are refused """
+        log = self.a1_log
+        for record in (lambda recorder: recorder.reveal(500), lambda recorder: recorder.flag(9),
+                       lambda recorder: self.a1_support.write_varint(recorder._data, 4 << 2 | log.QUIT_CODE)):
+            recorder = log.SessionRecorder(1, 3, 1)
+            record(recorder)
+            with self.assertRaises(ValueError):
+                log.replay(recorder.get_bytes())
+
+    def test_play_recorded(self):
+        """ test a game played at the prompts replays the same way """
+        for name, outcome in (("main_game_win", "win"), ("main_reset", "lose"),
+                              ("main_quit_yes", "quit")):
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "game.a1l")
+                with RedirectStdIO(stdinout=True) as stdio:
+                    stdio.stdin = self.load_test_data(name + ".in")
+                    self.a1_log.play_recorded(path, SEED)
+                with open(path, "rb") as file:
+                    data = file.read()
+            self.assertEqual(self.a1_log.replay(data)[0], outcome)
+            self.assertEqual(stdio.stdin, "")
+
+    def test_replay_transcripts(self):
+        """ test replaying recorded transcripts ends the way main does """
+        for name, outcome in (("main_game_win", "win"), ("main_game_over_2", "lose"),
+                              ("main_reset", "lose"), ("main_quit_yes", "quit"),
+                              ("main_quit_no", None)):
+            lines = self.load_test_data(name + ".in").splitlines()
+            log = self.a1_log.record_transcript(lines, SEED).get_bytes()
+            self.assertEqual(self.a1_log.replay(log)[0], outcome)
+
+
+class TestBatchMain(TestFunctionality):
+    """ Tests the non-interactive batch mode """
+
+    def test_transcripts(self):
+        """ test batch runs end the same way main does """
+        for name, outcome in (("main_game_win", "win"), ("main_game_over", "lose"),
+                              ("main_quit_yes", "quit"), ("main_invalid_action_1", None)):
+            lines = self.load_test_data(name + ".in").splitlines()
+            output = io.StringIO()
+            random.seed(SEED)
+            with RedirectStdIO(stdout=True) as stdio:
+                result = self.a1.batch_main(lines, output)
+            self.assertEqual(stdio.stdout, "")
+            self.assertEqual(result, outcome)
+            records = [json.loads(line) for line in output.getvalue().splitlines()]
+            self.assertEqual(records[-1]["outcome"], outcome)
+            self.assertEqual(records[-1]["actions"], len(records) - 1)
+
+    def test_results(self):
+        """ test the result reported for each kind of action """
+        output = io.StringIO()
+        lines = ["3", "1", "h", "A0", "q", "n", "f A1", "f A1"]
+        self.a1.batch_main(lines, output, rng=SEED, show_boards=True)
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([record.get("result") for record in records],
+                         ["help", "invalid", "continue", "flag", "unflag", None])
+        self.assertEqual(records[3]["board"], self.a1_support.FLAG + "~" * 8)
+
+
+class TestNoGuess(TestFunctionality):
+    """ Tests the no-guess board generator """
+
+    def test_solvable(self):
+        """ test generated boards can be won by the solver from the first click """
+        for seed in range(5):
+            locations = self.a1_noguess.generate_no_guess(8, 10, first_click=0, rng=seed)
+            self.assertEqual(len(set(locations)), 10)
+            self.assertNotIn(0, locations)
+            won = self.a1_simulator.play_game(8, 10, self.a1_simulator.solver_policy,
+                                              seed, no_guess=True)[0]
+            self.assertTrue(won)
+
+    def test_cache(self):
+        """ test cached boards are read back instead of generated """
+        with tempfile.TemporaryDirectory() as directory:
+            cache = self.a1_noguess.BoardCache(directory)
+            first = self.a1_noguess.generate_boards(6, 5, [1, 2], workers=0, cache=cache)
+            self.assertEqual(len(os.listdir(directory)), 2)
+            cache.put(6, 5, 1, 21, (0, 1, 2, 3, 4))
+            second = self.a1_noguess.generate_boards(6, 5, [1, 2], workers=0, cache=cache)
+            self.assertEqual(tuple(second[0]), (0, 1, 2, 3, 4))
+            self.assertEqual(second[1], first[1])
+
+    def test_damaged_cache(self):
+        """ test a damaged cached board is generated again """
+        with tempfile.TemporaryDirectory() as directory:
+            cache = self.a1_noguess.BoardCache(directory)
+            first = self.a1_noguess.generate_boards(6, 5, [1], workers=0, cache=cache)
+            path = os.path.join(directory, os.listdir(directory)[0])
+            with open(path, "r+b") as file:
+                file.truncate(6)
+            self.assertIsNone(cache.get(6, 5, 1, 21))
+            second = self.a1_noguess.generate_boards(6, 5, [1], workers=0, cache=cache)
+            self.assertEqual(second, first)
+            self.assertEqual(cache.get(6, 5, 1, 21), first[0])
+
+    def test_all_cached(self):
+        """ test no worker pool is started when every board is cached """
+        noguess = AttributeGuesser.get_wrapped_object(self.a1_noguess)
+        with tempfile.TemporaryDirectory() as directory:
+            cache = self.a1_noguess.BoardCache(directory)
+            first = self.a1_noguess.generate_boards(6, 5, [1, 2], workers=0, cache=cache)
+            pool = noguess.ProcessPoolExecutor
+            noguess.ProcessPoolExecutor = None
+            try:
+                second = self.a1_noguess.generate_boards(6, 5, [1, 2], cache=cache)
+            finally:
+                noguess.ProcessPoolExecutor = pool
+            self.assertEqual(second, first)
+
+
+class TestLazyPlacement(TestFunctionality):
+    """ Tests placing pokemons on the first reveal """
+
+    def test_place_pokemons(self):
+        """ test placement avoids the first click and counts neighbours """
+        for number in (10, 50):
+            game = self.a1_board.GameBoard(8)
+            self.assertIsNone(game.get_pokemon_locations())
+            locations = game.place_pokemons(number, 9, rng=SEED)
+            self.assertEqual(len(set(locations)), number)
+            for index in (0, 1, 2, 8, 9, 10, 16, 17, 18):
+                self.assertNotIn(index, locations)
+            self.assertEqual(game.get_adjacency(), self.a1_board.adjacency_counts(locations, 8))
+        game = self.a1_board.GameBoard(3)
+        self.assertEqual(len(game.place_pokemons(5, 4, rng=SEED)), 0)
+
+    def test_batch_lazy(self):
+        """ test a lazy game never ends on its first reveal """
+        for seed in range(10):
+            output = io.StringIO()
+            self.a1.batch_main(["6", "20", "C3", ":)", "A1"], output, rng=seed, lazy=True)
+            records = [json.loads(line) for line in output.getvalue().splitlines()]
+            self.assertEqual(records[0]["result"], "reveal")
+            self.assertEqual(records[2]["result"], "reveal")
+            self.assertEqual(records[-1]["board"][0], "0")
+
+
+class TestRevealMany(TestFunctionality):
+    """ Tests revealing several cells with one flood fill """
+
+    def test_matches_reveal_cells(self):
+        """ test the board matches revealing the cells one at a time """
+        random.seed(SEED)
+        for _ in range(10):
+            locations = self.a1_support.generate_pokemons(8, 8)
+            game = self.a1_board.GameBoard(8, pokemon_locations=locations)
+            game = self.a1.flag_cell(game, random.choice(locations))
+            safe = random.sample([i for i in range(64) if i not in locations], 4)
+            expected = str(game)
+            for index in safe:
+                if expected[index] != self.a1_support.FLAG:
+                    expected = self.a1.reveal_cells(expected, 8, locations, index)
+            result, changed = self.a1.reveal_many(str(game), 8, locations, safe)
+            self.assertEqual(result, expected)
+            before = str(game)
+            self.assertEqual(sorted(changed), [(i, result[i]) for i in range(64)
+                                               if before[i] != result[i]])
+
+    def test_board_in_place(self):
+        """ test a board is written in place and shared regions are visited once """
+        game = self.a1_board.GameBoard(4, pokemon_locations=())
+        result, changed = self.a1.reveal_many(game, 4, game.get_pokemon_locations(), [0, 15, 5])
+        self.assertIs(result, game)
+        self.assertEqual(str(game), "0" * 16)
+        self.assertEqual(len(changed), 16)
+
+
+class TestSaveFormat(TestFunctionality):
+    """ Tests packing and unpacking saved games """
+
+    def test_round_trip(self):
+        """ test a packed game unpacks to the same game """
+        support = self.a1_support
+        game = support.FLAG + "1" * 3 + support.UNEXPOSED * 20 + "0" * 11 + support.POKEMON
+        locations = (35, 2, 17)
+        data = self.a1_save.pack_game(game, 6, 3, locations, -9)
+        grid_size, number, loaded, pokemon_locations, seed = self.a1_save.unpack_game(data)
+        self.assertEqual((grid_size, number, loaded, seed), (6, 3, game, -9))
+        self.assertEqual(sorted(pokemon_locations), [2, 17, 35])
+        self.assertIn(17, pokemon_locations)
+        self.assertNotIn(18, pokemon_locations)
+
+    def test_unplaced(self):
+        """ test a game whose pokemons are still to be placed """
+        data = self.a1_save.pack_game(self.a1_support.UNEXPOSED * 400, 20, 30)
+        self.assertEqual(self.a1_save.unpack_game(data)[3:], (None, None))
+        self.assertLess(len(data), 20)
+
+    def test_damaged(self):
+        """ test damaged saves are refused """
+        data = self.a1_save.pack_game("12" * 8, 4, 1, (5,))
+        for damaged in (b"", data[:4] + b"\x07", data[:8], data[:-1], data + b"\x11"):
+            with self.assertRaises(ValueError):
+                self.a1_save.unpack_game(damaged)
+
+    def test_clamped(self):
+        """ test a game with fewer pokemons placed than asked for """
+        game = self.a1_board.GameBoard(4)
+        locations = game.place_pokemons(10, 5, rng=SEED)
+        self.assertLess(len(locations), 10)
+        data = self.a1_save.pack_game(game, 4, 10, locations, SEED)
+        number, _, pokemon_locations, _ = self.a1_save.unpack_game(data)[1:]
+        self.assertEqual(number, 10)
+        self.assertEqual(sorted(pokemon_locations), sorted(locations))
+
+    def test_long_run(self):
+        """ test a damaged run length is refused before it is built """
+        data = bytearray(self.a1_save.pack_game("0" * 16, 4, 0)[:-1])
+        self.a1_support.write_varint(data, 1 << 60)
+        with self.assertRaises(ValueError):
+            self.a1_save.unpack_game(bytes(data))
+
+    def test_write_save(self):
+        """ test saves are written whole to the path """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "game.a1s")
+            self.a1_save.write_save(path, "0" * 9, 3, 0, seed=4)
+            self.a1_save.write_save(path, "1" * 9, 3, 0, seed=5)
+            self.assertEqual(os.listdir(directory), ["game.a1s"])
+            self.assertEqual(self.a1_save.read_save(path)[2:], ("1" * 9, None, 5))
+
+
+class TestAutosave(TestFunctionality):
+    """ Tests writing autosaves in the background """
+
+    def test_coalesce(self):
+        """ test snapshots in quick succession are written once """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "auto.a1s")
+            saver = self.a1_autosave.Autosaver(path, delay=60)
+            for count in range(1, 10):
+                saver.schedule("1" * count + "0" * (9 - count), 3, 0)
+            self.assertTrue(saver.flush(timeout=1))
+            saver.close(timeout=1)
+            self.assertEqual(saver.get_num_writes(), 1)
+            self.assertEqual(self.a1_save.read_save(path)[2], "1" * 9)
+
+    def test_rotation(self):
+        """ test only the newest autosaves are kept """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "auto.a1s")
+            saver = self.a1_autosave.Autosaver(path, keep=2, delay=60)
+            for count in range(4):
+                saver.schedule("1" * count + "0" * (4 - count), 2, 0)
+                saver.flush(timeout=1)
+            saver.close(timeout=1)
+            self.assertEqual(sorted(os.listdir(directory)), ["auto.1.a1s", "auto.a1s"])
+            self.assertEqual(self.a1_save.read_save(os.path.join(directory, "auto.1.a1s"))[2], "1100")
+            self.assertEqual(self.a1_autosave.read_latest(path, 2)[2], "1110")
+
+    def test_read_latest_damaged(self):
+        """ test a damaged newest autosave falls back to an older one """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "auto.a1s")
+            saver = self.a1_autosave.Autosaver(path, delay=60)
+            saver.schedule("0" * 4, 2, 0)
+            saver.close(timeout=1)
+            os.replace(path, os.path.join(directory, "auto.1.a1s"))
+            with open(path, "wb") as file:
+                file.write(b"A1SV")
+            self.assertEqual(self.a1_autosave.read_latest(path)[2], "0" * 4)
+            os.remove(os.path.join(directory, "auto.1.a1s"))
+            with self.assertRaises(ValueError):
+                self.a1_autosave.read_latest(path)
+
+    def test_error(self):
+        """ test a failed write is kept for the caller """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "missing", "auto.a1s")
+            saver = self.a1_autosave.Autosaver(path, delay=60)
+            saver.schedule("0" * 4, 2, 0)
+            saver.close(timeout=1)
+            self.assertIsInstance(saver.pop_error(), OSError)
+            self.assertIsNone(saver.pop_error())
+            self.assertEqual(saver.get_num_writes(), 0)
+
+
+class TestBoardModel(TestFunctionality):
+    """ Tests the events BoardModel sends its subscribers """
+
+    def setUp(self):
+        self.model = self.a3.BoardModel(3, 2)
+        self.model.load(self.a1_support.UNEXPOSED * 9, (0, 8))
+        self.events = []
+        self.model.subscribe(self.events.append)
+
+    def test_batch(self):
+        """ test changes made in a batch reach subscribers as one event """
+        with self.model.batch():
+            self.model.flag_cell(self.model.get_game(), 0)
+            self.model.replace_character_at_index(self.model.get_game(), 4, "2")
+        self.assertEqual(len(self.events), 1)
+        event = self.events[0]
+        self.assertEqual(event.get_changes(), [(0, self.a1_support.UNEXPOSED, self.a1_support.FLAG),
+                                               (4, self.a1_support.UNEXPOSED, "2")])
+        self.assertFalse(event.is_reset())
+        self.assertEqual(event.get_status(), self.a3.PLAYING)
+
+    def test_no_change(self):
+        """ test writing a cell's own character sends no event """
+        self.model.replace_character_at_index(self.model.get_game(), 3, self.a1_support.UNEXPOSED)
+        self.assertEqual(self.events, [])
+
+    def test_reset(self):
+        """ test restart, new game and load each send one reset event """
+        self.model.restart()
+        self.model.new_game()
+        self.model.load("0" * 9, (), 3, 0)
+        self.assertEqual(len(self.events), 3)
+        for event in self.events:
+            self.assertTrue(event.is_reset())
+            self.assertEqual(event.get_changes(), [])
+        self.assertEqual(self.events[-1].get_status(), self.a3.WON)
+
+    def test_loss(self):
+        """ test showing a pokemon loses the game until it is restarted """
+        self.model.replace_character_at_index(self.model.get_game(), 8, self.a1_support.POKEMON)
+        self.assertEqual(self.events[-1].get_status(), self.a3.LOST)
+        self.assertEqual(self.events[-1].get_previous_status(), self.a3.PLAYING)
+        self.assertTrue(self.model.check_loss())
+        self.model.restart()
+        self.assertEqual(self.model.get_status(), self.a3.PLAYING)
+        self.assertFalse(self.model.check_loss())
+        self.model.load(self.a1_support.POKEMON + "1" * 8, (0, 8))
+        self.assertEqual(self.model.get_status(), self.a3.LOST)
+
+    def test_win(self):
+        """ test flagging every pokemon with the rest shown wins the game """
+        with self.model.batch():
+            for index in range(1, 8):
+                self.model.replace_character_at_index(self.model.get_game(), index, "1")
+            self.model.flag_cell(self.model.get_game(), 0)
+        self.assertEqual(self.model.get_status(), self.a3.PLAYING)
+        self.model.flag_cell(self.model.get_game(), 8)
+        self.assertEqual(self.events[-1].get_status(), self.a3.WON)
+        self.assertEqual(self.events[-1].get_previous_status(), self.a3.PLAYING)
+
+    def test_flag_wins(self):
+        """ test the flag that completes the board ends the game in both views """
+        a3 = AttributeGuesser.get_wrapped_object(self.a3)
+        messagebox = a3.messagebox
+        shown = []
+        a3.messagebox = type("Messages", (), {"showinfo": staticmethod(lambda *args: shown.append(args))})
+        try:
+            for view_class in (a3.BoardView, a3.ImageBoardView):
+                model = a3.BoardModel(3, 2)
+                model.load("~" + "1" * 7 + "~", (0, 8))
+                model.flag_cell(model.get_game(), 0)
+                closed = []
+                view = view_class.__new__(view_class)
+                view._game, view._grid_size, view._close = model, 3, lambda: closed.append(True)
+                view._right_click(2 * a3.cell_size + 1, 2 * a3.cell_size + 1)
+                self.assertEqual(model.get_status(), a3.WON)
+                self.assertEqual(closed, [True])
+        finally:
+            a3.messagebox = messagebox
+        self.assertEqual(len(shown), 2)
+
+    def test_lazy(self):
+        """ test a lazy model places its pokemons away from the first reveal """
+        model = self.a3.BoardModel(6, 5, lazy=True)
+        self.assertEqual(model.get_pokemon_location(), ())
+        model.place_pokemons(14)
+        locations = model.get_pokemon_location()
+        self.assertEqual(len(locations), 5)
+        self.assertFalse(set(locations) & {7, 8, 9, 13, 14, 15, 19, 20, 21})
+        model.place_pokemons(0)
+        self.assertEqual(model.get_pokemon_location(), locations)
+
+
+class TestImageCache(TestFunctionality):
+    """ Tests the sprite cache of the Tk game """
+
+    def setUp(self):
+        self.a3_module = AttributeGuesser.get_wrapped_object(self.a3)
+        self.loaded = []
+        self.photo_image = self.a3_module.tk.PhotoImage
+        self.a3_module.tk.PhotoImage = self.load
+        self.a3.clear_image_cache()
+
+    def tearDown(self):
+        self.a3_module.tk.PhotoImage = self.photo_image
+        self.a3.clear_image_cache()
+
+    def load(self, file):
+        """ stand in for tk.PhotoImage that only has gif images """
+        if file.endswith(".png"):
+            raise self.a3_module.tk.TclError("no png")
+        self.loaded.append(file)
+        return object()
+
+    def test_cached(self):
+        """ test an image is loaded once and then shared """
+        first = self.a3.get_image("images/pokeball")
+        self.assertIs(self.a3.get_image("images/pokeball"), first)
+        self.assertIsNot(self.a3.get_image("images/unrevealed"), first)
+        self.assertEqual(self.loaded, ["images/pokeball.gif", "images/unrevealed.gif"])
+
+    def test_clear(self):
+        """ test clearing the cache loads images again """
+        first = self.a3.get_image("images/pokeball")
+        self.a3.clear_image_cache()
+        self.assertEqual(self.a3_module._image_cache, {})
+        self.assertIsNot(self.a3.get_image("images/pokeball"), first)
+        self.assertEqual(len(self.loaded), 2)
+
+
 @skipIfFailed(TestDesign, TestDesign.test_functions_defined.__name__, tag=A1.main.__name__)
 class TestMain(TestFunctionality):
     """ Tests main """
@@ -545,6 +1398,30 @@ def main():
         TestNeighbourDirections,
         TestNumberAtCell,
         TestCheckWin,
+        TestGameBoard,
+        TestNeighbourTable,
+        TestAdjacencyCounts,
+        TestPokemonLocations,
+        TestBigFunSearch,
+        TestRevealIndex,
+        TestGeneratePokemons,
+        TestSeededGeneration,
+        TestBoardCounts,
+        TestTerminalRenderer,
+        TestLargeGrid,
+        TestChunkedBoard,
+        TestSimulator,
+        TestSolver,
+        TestBenchmarkBudget,
+        TestSessionLog,
+        TestBatchMain,
+        TestNoGuess,
+        TestLazyPlacement,
+        TestRevealMany,
+        TestSaveFormat,
+        TestAutosave,
+        TestBoardModel,
+        TestImageCache,
         TestMain
     ]
 
@@ -555,7 +1432,16 @@ def main():
                         include_no_print=True,
                         scripts=[
                             ('a1', 'a1.py'),
-                            ('a1_support', 'a1_support.py')
+                            ('a1_support', 'a1_support.py'),
+                            ('a1_board', 'a1_board.py'),
+                            ('a1_simulator', 'a1_simulator.py'),
+                            ('a1_solver', 'a1_solver.py'),
+                            ('a1_benchmark', 'a1_benchmark.py'),
+                            ('a1_log', 'a1_log.py'),
+                            ('a1_noguess', 'a1_noguess.py'),
+                            ('a1_save', 'a1_save.py'),
+                            ('a1_autosave', 'a1_autosave.py'),
+                            ('a3', 'a3.py')
                         ])
     master.run(test_cases)
 